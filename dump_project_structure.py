@@ -1,5 +1,7 @@
 import ast
+import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 PROJECT_ROOT = "src"
 
@@ -10,27 +12,37 @@ def extract_functions(file_path):
     functions = []
     classes = []
 
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
+    # 모듈 최상위 정의 + 클래스 메서드(한 단계)만 확인(ast.walk 전체 노드 순회 불필요)
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             functions.append(node.name)
         elif isinstance(node, ast.ClassDef):
             classes.append(node.name)
+            for sub in node.body:
+                if isinstance(sub, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    functions.append(sub.name)
 
     return classes, functions
 
 
-for root, _, files in os.walk(PROJECT_ROOT):
-    for file in files:
-        if file.endswith(".py"):
-            path = os.path.join(root, file)
-            classes, functions = extract_functions(path)
-
-            print(f"\n📄 {path}")
-            if classes:
-                print("  Classes:")
-                for c in classes:
-                    print(f"    - {c}")
-            if functions:
-                print("  Functions:")
-                for f in functions:
-                    print(f"    - {f}")
+def main():
+    paths = sorted(glob.glob(os.path.join(PROJECT_ROOT, "**", "*.py"), recursive=True))
+
+    # 파일 간 의존이 없는 CPU 작업(ast.parse)이라 프로세스 병렬로 파싱 후, 정렬된 순서로 출력
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = list(pool.map(extract_functions, paths, chunksize=8))
+
+    for path, (classes, functions) in zip(paths, results):
+        print(f"\n📄 {path}")
+        if classes:
+            print("  Classes:")
+            for c in classes:
+                print(f"    - {c}")
+        if functions:
+            print("  Functions:")
+            for f in functions:
+                print(f"    - {f}")
+
+
+if __name__ == "__main__":
+    main()
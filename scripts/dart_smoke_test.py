@@ -1,5 +1,7 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # API = os.getenv("DART_API_KEY")
 API = "b347a315a55beb3d6826379f95c06d2b48b8131a"
@@ -15,6 +17,10 @@ params = {
     "bgn_de": "20240101",
     "end_de": "20240131",
 }
-r = requests.get(url, params=params, timeout=30)
+# 커넥션 재사용(TLS 핸드셰이크 1회) + 일시 오류 재시도
+sess = requests.Session()
+sess.mount("https://", HTTPAdapter(pool_connections=50, pool_maxsize=50,
+                                   max_retries=Retry(total=3, backoff_factor=0.3)))
+r = sess.get(url, params=params, timeout=30)
 print("status", r.status_code)
 print(r.text[:300])
@@ -1,8 +1,10 @@
 from fastapi import FastAPI
 from .routes import router
+from .responses import ORJSONResponse
 from app.api.routes_srim import router as srim_router  # SW 관점: SRIM 라우터 등록
 
-app = FastAPI(title="KOSPI S-RIM (Quarterly Snapshot)")
+# SW 관점: 기본 응답도 orjson 직렬화(핸들러는 ORJSONResponse를 직접 반환해 jsonable_encoder 생략)
+app = FastAPI(title="KOSPI S-RIM (Quarterly Snapshot)", default_response_class=ORJSONResponse)
 
 app.include_router(router)
 
@@ -0,0 +1,51 @@
+# src/app/api/responses.py
+"""
+API 응답 직렬화 헬퍼 (orjson)
+
+원칙:
+- 조회 API는 수백~2000행의 RowMapping을 반환하므로, jsonable_encoder + stdlib json 경로가 병목
+- 핸들러는 이 파일의 ORJSONResponse를 직접 반환해 jsonable_encoder를 건너뛴다
+- Decimal(numeric 컬럼)/RowMapping 등 orjson이 모르는 타입만 _default에서 변환
+- 큰 목록(limit=2000)도 orjson.dumps 한 번으로 직렬화(청크 분할/스레드풀 왕복보다 빠름)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+
+def _default(o: Any) -> Any:
+    """orjson이 기본 지원하지 않는 타입 변환(NaN/Inf float는 orjson이 null로 직렬화)."""
+    if isinstance(o, Decimal):
+        return float(o)  # SW 관점: numeric 컬럼(psycopg2 Decimal) -> JSON number
+    if isinstance(o, Mapping):
+        return dict(o)  # SW 관점: SQLAlchemy RowMapping을 별도 변환 없이 그대로 반환 가능
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, UUID):
+        return str(o)
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """API 공통 JSON 직렬화(bytes)."""
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTS)
+
+
+class ORJSONResponse(Response):
+    """jsonable_encoder를 거치지 않고 orjson으로 바로 직렬화하는 응답 클래스."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
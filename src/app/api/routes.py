@@ -1,69 +1,65 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
-from ..db import get_db
+from sqlalchemy import desc, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_async_db
 from ..models import SRimResult, MarketSnapshot, Ticker
+from .responses import ORJSONResponse
 
 
-router = APIRouter()
+# SW 관점: /snapshots/* 경로(routes_srim의 /srim/* 와 경로가 겹치지 않음), OpenAPI 그룹만 분리
+router = APIRouter(tags=["snapshots"])
 
 @router.get("/snapshots/{snapshot_id}/srim")
-def list_srim(
+async def list_srim(
     snapshot_id: str,
     top_n: int | None = Query(default=None, ge=1, le=500),
     only_kospi: bool = True,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     - top_n: 상위 N(기본: 전체)
+    - only_kospi: tickers.market = 'KOSPI'만(기본 True)
     - 정렬: gap_pct desc
+
+    SW 관점: ORM Query 대신 Core select + mappings()로 조회(엔티티/identity-map 생성 없이 dict-like row만 생성)
     """
-    q = (
-        db.query(
+    stmt = (
+        select(
             Ticker.ticker,
             Ticker.name,
-            Ticker.sector_name,
+            Ticker.sector_name.label("sector"),
             SRimResult.fair_price,
             SRimResult.gap_pct,
             SRimResult.roe,
             SRimResult.bps,
             MarketSnapshot.close_price,
             MarketSnapshot.market_cap,
-            SRimResult.flags,
+            func.coalesce(SRimResult.flags, literal_column("'{}'::jsonb")).label("flags"),
         )
+        .select_from(Ticker)
         .join(SRimResult, SRimResult.ticker == Ticker.ticker)
         .join(MarketSnapshot, (MarketSnapshot.ticker == Ticker.ticker) & (MarketSnapshot.snapshot_id == snapshot_id))
-        .filter(SRimResult.snapshot_id == snapshot_id)
+        .where(SRimResult.snapshot_id == snapshot_id)
         .order_by(SRimResult.gap_pct.desc().nullslast())
     )
 
+    if only_kospi:
+        stmt = stmt.where(Ticker.market == "KOSPI")  # SW 관점: ix_tickers_market_ticker 사용
+
     if top_n:
-        q = q.limit(top_n)
+        stmt = stmt.limit(top_n)
 
-    rows = q.all()
-    return [
-        {
-            "ticker": r[0],
-            "name": r[1],
-            "sector": r[2],
-            "fair_price": float(r[3]) if r[3] is not None else None,
-            "gap_pct": float(r[4]) if r[4] is not None else None,
-            "roe": float(r[5]) if r[5] is not None else None,
-            "bps": float(r[6]) if r[6] is not None else None,
-            "close_price": float(r[7]) if r[7] is not None else None,
-            "market_cap": float(r[8]) if r[8] is not None else None,
-            "flags": r[9] or {},
-        }
-        for r in rows
-    ]
+    rows = (await db.execute(stmt)).mappings().all()
+    # SW 관점: Decimal -> float 변환은 ORJSONResponse(_default)가 담당
+    return ORJSONResponse(rows)
 
 
 @router.get("/snapshots/{snapshot_id}/market")
-def list_market(
+async def list_market(
     snapshot_id: str,
     top_n: int | None = Query(default=100, ge=1, le=1000),
     order_by: str = Query(default="market_cap"),  # market_cap | close_price
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     snapshot_id 기준 KOSPI 시장 데이터 조회
@@ -72,30 +68,23 @@ def list_market(
     """
     order_col = MarketSnapshot.market_cap if order_by == "market_cap" else MarketSnapshot.close_price
 
-    q = (
-        db.query(
+    # SW 관점: AsyncSession에는 legacy Query(db.query)가 없으므로 Core select로 조회
+    stmt = (
+        select(
             Ticker.ticker,
             Ticker.name,
             MarketSnapshot.close_price,
             MarketSnapshot.market_cap,
             MarketSnapshot.shares_out,
         )
+        .select_from(Ticker)
         .join(MarketSnapshot, (MarketSnapshot.ticker == Ticker.ticker) & (MarketSnapshot.snapshot_id == snapshot_id))
         .order_by(desc(order_col).nullslast())
     )
 
     if top_n:
-        q = q.limit(top_n)
+        stmt = stmt.limit(top_n)
 
-    rows = q.all()
-    return [
-        {
-            "ticker": r[0],
-            "name": r[1],
-            "close_price": float(r[2]) if r[2] is not None else None,
-            "market_cap": float(r[3]) if r[3] is not None else None,
-            "shares_out": float(r[4]) if r[4] is not None else None,
-        }
-        for r in rows
-    ]
+    rows = (await db.execute(stmt)).mappings().all()
+    return ORJSONResponse(rows)
 
@@ -1,15 +1,10 @@
 # src/app/api/routes_srim.py
-from __future__ import annotations
-
-from collections import Counter
-from typing import Tuple
-from fastapi import HTTPException
 """
 S-RIM 조회 API (FastAPI)
 
 원칙:
 - 조회 전용(Read-only)
-- DB 접근은 SQLAlchemy Session + text SQL로 단순화
+- DB 접근은 SQLAlchemy AsyncSession(asyncpg) + text SQL로 단순화
 - DDL 정합성 유지(srim_result 컬럼 기준)
 - flags(jsonb) 기반 필터 제공
 
@@ -17,14 +12,18 @@ S-RIM 조회 API (FastAPI)
 - 기존 업로드된 routes_srim.py에는 srim_result에 없는 컬럼(srim_price, spread 등) 참조가 있었음.
   이 파일은 현재 DDL/모델에 맞게 수정한 버전.
 """
+from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db  # 공통 get_db 사용 (중복 제거)
+from app.db import get_async_db  # SW 관점: 조회 API는 async 세션(이벤트 루프에서 DB I/O 대기)
+from app.api.responses import ORJSONResponse  # SW 관점: jsonable_encoder 생략(orjson 직접 직렬화)
 
 
 router = APIRouter(prefix="/srim", tags=["srim"])
@@ -47,22 +46,72 @@ WARN_FLAG_KEYS = {
     "FLAG_NEGATIVE_RESIDUAL_CLAMPED",
 }
 
+# SQL 품질 분류(서버측 유일한 분류 구현)
+# - 정책은 위 EXCLUDE_FLAG_KEYS / WARN_FLAG_KEYS 한 곳: _snapshot_where가 :quality_exclude_keys /
+#   :quality_warn_keys로 바인딩하므로 키 집합만 고치면 분류/근거/필터가 함께 바뀜
+# - jsonb ?| text[] : 키 중 하나라도 있으면 true (flags가 null이면 OK로 취급)
+QUALITY_SQL = """
+    case
+      when coalesce(sr.flags ?| cast(:quality_exclude_keys as text[]), false) then 'EXCLUDE'
+      when coalesce(sr.flags ?| cast(:quality_warn_keys as text[]), false) then 'WARN'
+      else 'OK'
+    end
+"""
+
+# SQL 분류 근거(QUALITY_SQL과 같은 키 집합: EXCLUDE 키 우선, 없으면 WARN 키, 키 배열 순서(정렬)대로)
+QUALITY_REASONS_SQL = """
+    case
+      when coalesce(sr.flags ?| cast(:quality_exclude_keys as text[]), false)
+        then array(select k from unnest(cast(:quality_exclude_keys as text[])) as k where sr.flags ? k)
+      when coalesce(sr.flags ?| cast(:quality_warn_keys as text[]), false)
+        then array(select k from unnest(cast(:quality_warn_keys as text[])) as k where sr.flags ? k)
+      else cast(array[] as text[])
+    end
+"""
+
+# keyset 페이징을 지원하는 정렬(정렬 방향에 맞는 row 비교 연산자)
+# - gap_pct가 null인 행은 커서 비교에서 빠지므로 only_calc_ready=True(기본)와 함께 사용
+KEYSET_SORTS = {"gap_desc": "<", "gap_asc": ">"}
+
 # -----------------------------
 # 공통 헬퍼
 # -----------------------------
-def latest_snapshot_id(db: Session) -> str:
-    """snapshots에서 최신 snapshot_id를 가져온다."""
-    row = db.execute(
+# 최신 snapshot_id 메모이제이션(프로세스 내)
+# - 스냅샷은 분기 단위로만 바뀌므로 /latest 호출마다 DB 왕복할 필요 없음
+# - 새 스냅샷 적재 후에는 TTL(워커 프로세스별) 만료 시 반영
+LATEST_SNAPSHOT_TTL_SEC = 60.0
+_latest_snapshot_cache: Optional[Tuple[str, float]] = None  # (snapshot_id, expires_at[monotonic])
+
+
+# snapshot_id별 flags 키 빈도(/{snapshot_id}/flags) 캐시
+# - 같은 snapshot_id로 stage3를 재실행하면 flags가 바뀌고 무효화 훅은 없으므로,
+#   TTL을 최신 스냅샷 캐시와 같게 두어 재계산 결과가 최대 60초 안에 반영되도록 함
+FLAGS_HIST_TTL_SEC = LATEST_SNAPSHOT_TTL_SEC
+FLAGS_HIST_CACHE_MAX = 32
+_flags_hist_cache: Dict[Tuple[str, int], Tuple[Dict[str, Any], float]] = {}  # (sid, limit) -> (payload, expires_at)
+
+
+async def latest_snapshot_id(db: AsyncSession) -> str:
+    """snapshots에서 최신 snapshot_id를 가져온다(짧은 TTL 캐시)."""
+    global _latest_snapshot_cache
+    cached = _latest_snapshot_cache
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+
+    row = (await db.execute(
         text("""
             select snapshot_id
             from snapshots
             order by as_of_date desc, created_at desc
             limit 1
         """)
-    ).fetchone()
+    )).fetchone()
     if not row:
         raise ValueError("snapshots 테이블에 데이터가 없습니다.")
-    return str(row[0])
+
+    sid = str(row[0])
+    _latest_snapshot_cache = (sid, time.monotonic() + LATEST_SNAPSHOT_TTL_SEC)
+    return sid
 
 
 def normalize_ticker(t: str) -> str:
@@ -70,29 +119,36 @@ def normalize_ticker(t: str) -> str:
     return str(t).strip().zfill(6)
 
 
+# 경로 파라미터 ticker 검증 — 잘못된 입력은 핸들러/DB 진입 전에 422
+# - 숫자만이 아니라 영숫자 1~6자리 허용: KRX는 숫자 단축코드 소진으로 신규 상장분에 영문이 섞인
+#   단축코드(예: 0088M0 형태)를 부여하므로 숫자 전용 패턴이면 해당 종목 조회가 막힘
+# - 앞뒤 공백은 기존 normalize_ticker처럼 허용(검증 후 normalize_ticker로 strip + zfill)
+TICKER_PATH = Path(..., pattern=r"^\s*[0-9A-Za-z]{1,6}\s*$", description="종목코드(앞자리 0 생략 가능)")
+
+
 # -----------------------------
 # Endpoints
 # -----------------------------
 @router.get("/snapshots")
-def list_snapshots(db: Session = Depends(get_db)):
+async def list_snapshots(db: AsyncSession = Depends(get_async_db)):
     """
     스냅샷 목록(최신순) 조회
 
     Streamlit UI에서 snapshot 선택 dropdown에 사용
     """
-    rows = db.execute(
+    rows = (await db.execute(
         text("""
             select snapshot_id, as_of_date, created_at, note
             from snapshots
             order by as_of_date desc, created_at desc
         """)
-    ).mappings().all()
-    return {"count": len(rows), "items": rows}
+    )).mappings().all()
+    return ORJSONResponse({"count": len(rows), "items": rows})
 
 
 @router.get("/latest")
-def get_latest(
-    db: Session = Depends(get_db),
+async def get_latest(
+    db: AsyncSession = Depends(get_async_db),
     only_calc_ready: bool = Query(True, description="fair_price/gap_pct가 있는 행만"),
     min_gap_pct: Optional[float] = Query(None),
     max_gap_pct: Optional[float] = Query(None),
@@ -100,12 +156,16 @@ def get_latest(
     limit: int = Query(200, ge=1, le=2000),
     offset: int = Query(0, ge=0),
     sort: str = Query("gap_desc", description="gap_desc|gap_asc|fair_desc|fair_asc|roe_desc|roe_asc"),
+    after_gap: Optional[float] = Query(None, description="keyset 커서: 직전 페이지 마지막 gap_pct"),
+    after_ticker: Optional[str] = Query(None, description="keyset 커서: 직전 페이지 마지막 ticker"),
 ):
     """
     최신 snapshot_id 기준 SRIM 결과 조회
+
+    - gap 정렬은 응답의 next_cursor(gap/ticker)를 after_gap/after_ticker로 넘기면 keyset 페이징
     """
-    sid = latest_snapshot_id(db)
-    return get_snapshot(
+    sid = await latest_snapshot_id(db)
+    return ORJSONResponse(await query_snapshot(
         snapshot_id=sid,
         db=db,
         only_calc_ready=only_calc_ready,
@@ -115,13 +175,15 @@ def get_latest(
         limit=limit,
         offset=offset,
         sort=sort,
-    )
+        after_gap=after_gap,
+        after_ticker=after_ticker,
+    ))
 
 
 @router.get("/{snapshot_id}")
-def get_snapshot(
+async def get_snapshot(
     snapshot_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     only_calc_ready: bool = Query(True),
     min_gap_pct: Optional[float] = Query(None),
     max_gap_pct: Optional[float] = Query(None),
@@ -129,21 +191,131 @@ def get_snapshot(
     limit: int = Query(200, ge=1, le=2000),
     offset: int = Query(0, ge=0),
     sort: str = Query("gap_desc"),
+    after_gap: Optional[float] = Query(None),
+    after_ticker: Optional[str] = Query(None),
+    only_positive_gap: bool = Query(False),
+    exclude_quality: bool = Query(False),
+    warn_only: bool = Query(False),
+    quality: Optional[str] = Query(None, description="OK/WARN/EXCLUDE 중 하나만 보기"),
 ):
     """
     특정 snapshot_id 기준 SRIM 결과 조회
 
+    - gap 정렬은 응답의 next_cursor(gap/ticker)를 after_gap/after_ticker로 넘기면 keyset 페이징
+    - 품질(quality/exclude_quality/warn_only)·양수 gap 필터도 SQL에서 처리(클라이언트 후처리 불필요)
+    """
+    return ORJSONResponse(await query_snapshot(
+        snapshot_id=snapshot_id,
+        db=db,
+        only_calc_ready=only_calc_ready,
+        min_gap_pct=min_gap_pct,
+        max_gap_pct=max_gap_pct,
+        exclude_flags=exclude_flags,
+        only_positive_gap=only_positive_gap,
+        exclude_quality=exclude_quality,
+        warn_only=warn_only,
+        quality=quality,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        after_gap=after_gap,
+        after_ticker=after_ticker,
+    ))
+
+
+def _snapshot_where(
+    snapshot_id: str,
+    *,
+    only_calc_ready: bool,
+    min_gap_pct: Optional[float],
+    max_gap_pct: Optional[float],
+    exclude_flags: Optional[List[str]],
+    only_positive_gap: bool,
+    exclude_quality: bool,
+    warn_only: bool,
+    quality: Optional[str] = None,
+) -> Tuple[List[str], Dict[str, Any]]:
+    """srim_result(sr) 기준 WHERE 절/바인딩 파라미터 구성(조회/집계 쿼리 공용)."""
+    where = ["sr.snapshot_id = :sid"]
+    params: Dict[str, Any] = {
+        "sid": snapshot_id,
+        "quality_exclude_keys": sorted(EXCLUDE_FLAG_KEYS),
+        "quality_warn_keys": sorted(WARN_FLAG_KEYS),
+    }
+
+    if only_calc_ready:
+        where.append("sr.fair_price is not null")
+        where.append("sr.gap_pct is not null")
+
+    if min_gap_pct is not None:
+        where.append("sr.gap_pct >= :min_gap")
+        params["min_gap"] = float(min_gap_pct)
+
+    if max_gap_pct is not None:
+        where.append("sr.gap_pct <= :max_gap")
+        params["max_gap"] = float(max_gap_pct)
+
+    if only_positive_gap:
+        where.append("sr.gap_pct > 0")
+
+    if exclude_flags:
+        # SW 관점: flag마다 `?` 절을 만들지 않고 `?|` 한 번으로 검사(jsonb_exists_any 1회)
+        where.append("not (sr.flags ?| cast(:excl_flags as text[]))")
+        params["excl_flags"] = [str(f) for f in exclude_flags]
+
+    if exclude_quality:
+        where.append("not coalesce(sr.flags ?| cast(:quality_exclude_keys as text[]), false)")
+
+    if warn_only:
+        where.append(f"({QUALITY_SQL}) = 'WARN'")
+
+    if quality:
+        where.append(f"({QUALITY_SQL}) = :quality")
+        params["quality"] = quality.upper()
+
+    return where, params
+
+
+async def query_snapshot(
+    snapshot_id: str,
+    db: AsyncSession,
+    *,
+    only_calc_ready: bool = True,
+    min_gap_pct: Optional[float] = None,
+    max_gap_pct: Optional[float] = None,
+    exclude_flags: Optional[List[str]] = None,
+    only_positive_gap: bool = False,
+    exclude_quality: bool = False,
+    warn_only: bool = False,
+    quality: Optional[str] = None,
+    limit: int = 200,
+    offset: int = 0,
+    sort: str = "gap_desc",
+    after_gap: Optional[float] = None,
+    after_ticker: Optional[str] = None,
+    include_quality_reasons: bool = False,
+) -> Dict[str, Any]:
+    """
+    /srim/{snapshot_id}, /latest, /screen 공통 조회 로직(응답 객체가 아닌 dict 반환)
+
     추가(추천 고도화용):
     - roe_derived: net_income_parent / equity_parent
     - bps_derived: equity_parent / shares_out
     - pbr_derived: market_cap / equity_parent (가능한 경우)
+    - quality: flags 기반 OK/WARN/EXCLUDE (SQL에서 분류)
+    - quality_reasons: 분류 근거 flag 목록(include_quality_reasons=True일 때, SQL에서 계산)
+
+    페이징:
+    - offset: 기존 방식(깊은 페이지일수록 정렬 후 버리는 행이 늘어남)
+    - after_gap/after_ticker(gap_desc/gap_asc 전용): (gap_pct, ticker) keyset 커서, 페이지 깊이와 무관하게 O(limit)
     """
 
     # (1) 정렬 화이트리스트(SQL injection 방지)
     # - 파생 컬럼도 정렬 가능하도록 확장
+    # - gap 정렬은 ticker를 tie-breaker로 붙여 keyset 커서가 유일하게 정해지도록 함
     sort_map = {
-        "gap_desc": "sr.gap_pct desc nulls last",
-        "gap_asc": "sr.gap_pct asc nulls last",
+        "gap_desc": "sr.gap_pct desc nulls last, sr.ticker desc",
+        "gap_asc": "sr.gap_pct asc nulls last, sr.ticker asc",
         "fair_desc": "sr.fair_price desc nulls last",
         "fair_asc": "sr.fair_price asc nulls last",
         "roe_desc": "sr.roe desc nulls last",
@@ -164,26 +336,33 @@ def get_snapshot(
     order_by = sort_map.get(sort, sort_map["gap_desc"])
 
     # (2) WHERE 동적 구성(파라미터 바인딩)
-    where = ["sr.snapshot_id = :sid"]
-    params: Dict[str, Any] = {"sid": snapshot_id, "limit": limit, "offset": offset}
-
-    if only_calc_ready:
-        where.append("sr.fair_price is not null")
-        where.append("sr.gap_pct is not null")
-
-    if min_gap_pct is not None:
-        where.append("sr.gap_pct >= :min_gap")
-        params["min_gap"] = float(min_gap_pct)
-
-    if max_gap_pct is not None:
-        where.append("sr.gap_pct <= :max_gap")
-        params["max_gap"] = float(max_gap_pct)
-
-    if exclude_flags:
-        for i, f in enumerate(exclude_flags):
-            key = f"exf_{i}"
-            where.append(f"not (sr.flags ? :{key})")
-            params[key] = str(f)
+    where, params = _snapshot_where(
+        snapshot_id,
+        only_calc_ready=only_calc_ready,
+        min_gap_pct=min_gap_pct,
+        max_gap_pct=max_gap_pct,
+        exclude_flags=exclude_flags,
+        only_positive_gap=only_positive_gap,
+        exclude_quality=exclude_quality,
+        warn_only=warn_only,
+        quality=quality,
+    )
+    # (2-1) keyset 페이징: 직전 페이지 마지막 (gap_pct, ticker) 다음부터
+    # - ix_srim_snap_gap_ticker(snapshot_id, gap_pct desc, ticker desc) 인덱스 범위 스캔으로 처리됨
+    keyset_op = KEYSET_SORTS.get(sort)
+    if keyset_op and after_gap is not None:
+        if after_ticker is not None:
+            where.append(f"(sr.gap_pct, sr.ticker) {keyset_op} (:after_gap, :after_ticker)")
+            params["after_ticker"] = normalize_ticker(after_ticker)
+        else:
+            where.append(f"sr.gap_pct {keyset_op} :after_gap")
+        params["after_gap"] = float(after_gap)
+        offset = 0  # SW 관점: 커서가 위치를 대신하므로 offset은 무시
+
+    params["limit"] = limit
+    params["offset"] = offset
+
+    reasons_col = f",\n          {QUALITY_REASONS_SQL} as quality_reasons" if include_quality_reasons else ""
 
     # (3) 파생 컬럼(roe_derived, bps_derived, pbr_derived)을 SELECT에서 계산
     # - nullif로 0 나눗셈 방지
@@ -212,7 +391,8 @@ def get_snapshot(
           sr.roe,
           sr.r as discount_rate,
           sr.flags,
-          sr.computed_at
+          {QUALITY_SQL} as quality,
+          sr.computed_at{reasons_col}
         from srim_result sr
         left join tickers t
           on t.ticker = sr.ticker
@@ -225,16 +405,37 @@ def get_snapshot(
         where {" and ".join(where)}
         order by {order_by}
         limit :limit offset :offset
-    """)
+    """).columns(flags=JSONB)  # SW 관점: text()는 결과 타입 정보가 없으므로 flags 컬럼 타입(JSONB)을 명시(jsonb 디코드는 드라이버 코덱이 처리, 별도 json 파싱 불필요)
+
+    rows = (await db.execute(sql, params)).mappings().all()
 
-    rows = db.execute(sql, params).mappings().all()
-    return {"snapshot_id": snapshot_id, "count": len(rows), "items": rows}
+    # 다음 페이지 커서(gap 정렬 + 페이지가 가득 찬 경우만)
+    next_cursor = None
+    if keyset_op and rows and len(rows) == limit and rows[-1]["gap_pct"] is not None:
+        next_cursor = {"gap": float(rows[-1]["gap_pct"]), "ticker": rows[-1]["ticker"]}
+
+    return {"snapshot_id": snapshot_id, "count": len(rows), "items": rows, "next_cursor": next_cursor}
+
+
+async def count_snapshot_quality(db: AsyncSession, snapshot_id: str, **filters: Any) -> Dict[str, int]:
+    """query_snapshot과 같은 필터 조건에서 quality별 건수(페이징 무관)를 집계."""
+    where, params = _snapshot_where(snapshot_id, **filters)
+    rows = (await db.execute(
+        text(f"""
+            select {QUALITY_SQL} as quality, count(*) as cnt
+            from srim_result sr
+            where {" and ".join(where)}
+            group by 1
+        """),
+        params,
+    )).fetchall()
+    return {str(r[0]): int(r[1]) for r in rows}
 
 
 @router.get("/tickers/{ticker}/latest")
-def get_ticker_latest(
-    ticker: str,
-    db: Session = Depends(get_db),
+async def get_ticker_latest(
+    ticker: str = TICKER_PATH,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     특정 ticker의 최신 SRIM 결과 1건
@@ -243,7 +444,7 @@ def get_ticker_latest(
     """
     tk = normalize_ticker(ticker)
 
-    row = db.execute(
+    row = (await db.execute(
         text("""
             select
               sr.snapshot_id,
@@ -267,53 +468,17 @@ def get_ticker_latest(
             where sr.ticker = :tk
             order by sr.snapshot_id desc
             limit 1
-        """),
+        """).columns(flags=JSONB),
         {"tk": tk},
-    ).mappings().first()
+    )).mappings().first()
 
-    return row
-
-
-def classify_flags(flags: dict) -> Tuple[str, list[str]]:
-    """
-    flags(JSONB)를 보고 결과를 OK/WARN/EXCLUDE로 분류한다.
-
-    반환:
-      - quality: "OK" | "WARN" | "EXCLUDE"
-      - reasons: 분류 근거 flag 목록
-
-    설계 의도:
-    - EXCLUDE: 아예 스크리너에서 기본적으로 제외할 케이스
-    - WARN: 스크리너에는 포함할 수 있으나, UI에서 경고로 표시할 케이스
-    - OK: 상대적으로 해석이 깔끔한 케이스
-    """
-    if not isinstance(flags, dict):
-        return ("WARN", ["FLAG_INVALID_FLAGS_FORMAT"])
-
-    reasons = []
-
-    # 1) EXCLUDE 우선
-    for k in EXCLUDE_FLAG_KEYS:
-        if k in flags:
-            reasons.append(k)
-    if reasons:
-        return ("EXCLUDE", reasons)
-
-    # 2) WARN
-    for k in WARN_FLAG_KEYS:
-        if k in flags:
-            reasons.append(k)
-    if reasons:
-        return ("WARN", reasons)
-
-    # 3) OK
-    return ("OK", [])
+    return ORJSONResponse(row)
 
 
 @router.get("/{snapshot_id}/flags")
-def list_flags_for_snapshot(
+async def list_flags_for_snapshot(
     snapshot_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(50, ge=1, le=500),
 ):
     """
@@ -321,29 +486,39 @@ def list_flags_for_snapshot(
 
     Streamlit의 '제외 flags' 옵션을 자동화하기 위한 API.
     """
-    rows = db.execute(
+    key = (snapshot_id, limit)
+    cached = _flags_hist_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return ORJSONResponse(cached[0])
+
+    # SW 관점: 키 집계를 Postgres에서 한 번에 수행(jsonb 전체를 파이썬으로 가져와 Counter 돌리지 않음)
+    rows = (await db.execute(
         text("""
-            select flags
-            from srim_result
-            where snapshot_id = :sid
+            select k.key, count(*) as cnt
+            from srim_result sr
+            cross join lateral jsonb_object_keys(sr.flags) as k(key)
+            where sr.snapshot_id = :sid
+              and jsonb_typeof(sr.flags) = 'object'
+            group by k.key
+            order by cnt desc, k.key
+            limit :limit
         """),
-        {"sid": snapshot_id},
-    ).mappings().all()
+        {"sid": snapshot_id, "limit": limit},
+    )).fetchall()
 
-    counter = Counter()
-    for r in rows:
-        flags = r.get("flags") or {}
-        if isinstance(flags, dict):
-            counter.update(flags.keys())
+    items = [{"key": str(r[0]), "count": int(r[1])} for r in rows]
+    payload = {"snapshot_id": snapshot_id, "count": len(items), "items": items}
 
-    items = [{"key": k, "count": c} for k, c in counter.most_common(limit)]
-    return {"snapshot_id": snapshot_id, "count": len(items), "items": items}
+    if len(_flags_hist_cache) >= FLAGS_HIST_CACHE_MAX:
+        _flags_hist_cache.pop(next(iter(_flags_hist_cache)))  # SW 관점: 가장 오래 저장된 항목부터 제거
+    _flags_hist_cache[key] = (payload, time.monotonic() + FLAGS_HIST_TTL_SEC)
+    return ORJSONResponse(payload)
 
 
 @router.get("/{snapshot_id}/screen")
-def screen_snapshot(
+async def screen_snapshot(
     snapshot_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # 스크리너 조건들(리서치/학습용)
     min_gap_pct: float = Query(0.0, description="gap_pct 최소"),
     only_positive_gap: bool = Query(True, description="저평가 후보만: gap_pct > 0"),
@@ -358,74 +533,44 @@ def screen_snapshot(
     - 기본: gap_pct가 양수(저평가 후보) + min_gap_pct 이상
     - flags 기반으로 OK/WARN/EXCLUDE 분류
     - exclude_quality=True면 EXCLUDE는 제외
+
+    SW 관점: gap/품질 필터, 페이징, 분류 근거(quality_reasons)까지 모두 SQL에서 처리하고
+    조회된 행을 그대로 반환(행마다 dict 복사/재분류 없음).
     """
-    # 우선 snapshot 결과를 넉넉히 가져온 뒤(정렬 포함),
-    # 서버에서 quality 분류와 필터링을 적용하는 구조.
-    # (추후 성능이 필요하면 SQL에서 더 밀어넣는 최적화 가능)
-    base = get_snapshot(
-        snapshot_id=snapshot_id,
-        db=db,
+    filters = dict(
         only_calc_ready=True,    # 스크리너는 계산 성공만 기준
-        min_gap_pct=None,        # 아래에서 파이썬 필터로 처리
+        min_gap_pct=float(min_gap_pct),
         max_gap_pct=None,
         exclude_flags=None,
-        limit=2000,              # 서버측에서 먼저 풀로 받고 필터
-        offset=0,
+        only_positive_gap=only_positive_gap,
+        exclude_quality=exclude_quality,
+        warn_only=warn_only,
+    )
+    base = await query_snapshot(
+        snapshot_id=snapshot_id,
+        db=db,
+        limit=limit,
+        offset=offset,
         sort="gap_desc",
+        include_quality_reasons=True,
+        **filters,
     )
 
-    items = base["items"]
-
-    screened = []
-    for it in items:
-        gap = it.get("gap_pct")
-        if gap is None:
-            continue
-
-        # (1) min_gap_pct 필터
-        if gap < float(min_gap_pct):
-            continue
-
-        # (2) 저평가 후보만 보기 옵션
-        if only_positive_gap and gap <= 0:
-            continue
-
-        # (3) flags 기반 품질 분류
-        flags = it.get("flags") or {}
-        quality, reasons = classify_flags(flags)
-
-        # (4) exclude_quality 옵션
-        if exclude_quality and quality == "EXCLUDE":
-            continue
-
-        # (5) warn_only 옵션(학습용)
-        if warn_only and quality != "WARN":
-            continue
-
-        # 결과에 품질/근거를 덧붙여 반환
-        it2 = dict(it)
-        it2["quality"] = quality
-        it2["quality_reasons"] = reasons
-        screened.append(it2)
-
-    # 페이징
-    sliced = screened[offset: offset + limit]
-
     # 간단한 통계도 함께 반환(학습에 도움)
-    counts = Counter([x["quality"] for x in screened])
-    return {
+    counts = await count_snapshot_quality(db, snapshot_id, **filters)
+    return ORJSONResponse({
         "snapshot_id": snapshot_id,
-        "total_after_filter": len(screened),
-        "quality_counts": dict(counts),
-        "items": sliced,
-    }
-        
-    
+        "total_after_filter": sum(counts.values()),
+        "quality_counts": counts,
+        "items": base["items"],
+    })
+
+
 @router.get("/{snapshot_id}/ticker/{ticker}")
-def get_ticker_detail(
+async def get_ticker_detail(
     snapshot_id: str,
-    ticker: str,
-    db: Session = Depends(get_db),
+    ticker: str = TICKER_PATH,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     학습/리서치용 종목 상세 API
@@ -439,7 +584,7 @@ def get_ticker_detail(
     """
     tk = normalize_ticker(ticker)
 
-    row = db.execute(
+    row = (await db.execute(
         text("""
             select
               t.ticker,
@@ -470,19 +615,33 @@ def get_ticker_detail(
               sr.flags,
               sr.computed_at
             from tickers t
-            left join market_snapshot ms
-              on ms.snapshot_id = :sid and ms.ticker = t.ticker
-            left join fundamental_snapshot fs
-              on fs.snapshot_id = :sid and fs.ticker = t.ticker
-            left join discount_rate_snapshot dr
-              on dr.snapshot_id = :sid
-            left join srim_result sr
-              on sr.snapshot_id = :sid and sr.ticker = t.ticker
+            -- SW 관점: 종목 1건에 대한 (snapshot_id, ticker) PK 조회이므로 LATERAL 1행 lookup으로 구성
+            -- (조인 순서 탐색 없이 각 테이블을 PK/커버링 인덱스로 1회씩 probe)
+            left join lateral (
+              select close_price, market_cap, shares_out, treasury_shares, float_shares
+              from market_snapshot
+              where snapshot_id = :sid and ticker = t.ticker
+            ) ms on true
+            left join lateral (
+              select fs_year, report_code, is_consolidated, equity_parent, net_income_parent, data_quality
+              from fundamental_snapshot
+              where snapshot_id = :sid and ticker = t.ticker
+            ) fs on true
+            left join lateral (
+              select rate
+              from discount_rate_snapshot
+              where snapshot_id = :sid
+            ) dr on true
+            left join lateral (
+              select bps, roe, r, fair_price, gap_pct, flags, computed_at
+              from srim_result
+              where snapshot_id = :sid and ticker = t.ticker
+            ) sr on true
             where t.ticker = :tk
             limit 1
-        """),
+        """).columns(flags=JSONB, data_quality=JSONB),
         {"sid": snapshot_id, "tk": tk},
-    ).mappings().first()
+    )).mappings().first()
 
     if not row:
         raise HTTPException(status_code=404, detail="Ticker not found")
@@ -512,4 +671,4 @@ def get_ticker_detail(
     data["bps_derived"] = bps_derived
     data["roe_derived"] = roe_derived
 
-    return data
\ No newline at end of file
+    return ORJSONResponse(data)
\ No newline at end of file
@@ -7,6 +7,17 @@ class Settings(BaseSettings):
     # MVP: r(요구수익률) 수동 입력(분기 1회)
     DEFAULT_DISCOUNT_RATE: float = 0.10
 
+    # ETL Stage2: DART 재무/주식수 조회 동시 스레드 수(DART 조회 한도 고려, 1이면 순차)
+    DART_MAX_WORKERS: int = 8
+
+    # ETL Stage3: S-RIM 계산 엔진("python": compute_srim_arrays, "sql": DB 안에서 INSERT ... SELECT 한 문장)
+    SRIM_ENGINE: str = "python"
+
+    # API(async) 커넥션 풀: 체크아웃마다 pre-ping(SELECT 1) 대신 주기적 recycle로 끊긴 연결 정리
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 25
+    DB_POOL_RECYCLE_SEC: int = 1800
+
     class Config:
         env_file = ".env"
 
@@ -1,13 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# SW 관점: ETL/스크립트(배치, 쓰기)는 sync 엔진(psycopg2)
+# - executemany_mode="values_plus_batch": text() 업서트의 executemany는 psycopg2 execute_batch(페이지 단위 전송),
+#   Core insert()는 multi-VALUES 한 문장(insertmanyvalues)으로 전송 → 행마다 왕복하지 않음
+# - 배치는 연결 하나를 잠깐 체크아웃해 파이프라인을 돌리고 종료 → 체크아웃마다 pre-ping(SELECT 1) 생략,
+#   LIFO로 가장 최근 연결을 재사용(서버측 캐시 locality, 남는 idle 연결은 자연히 정리)
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_pre_ping=False,
+    pool_use_lifo=True,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,  # etl.load.PG_BATCH_PAGE_SIZE와 동일(문장당 ~1k행)
+    executemany_batch_page_size=500,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# SW 관점: FastAPI 조회 API는 async 엔진(asyncpg) — 같은 DATABASE_URL에서 드라이버만 교체
+# - 작은 쿼리가 대부분이라 체크아웃마다 pre-ping 왕복을 하지 않고, pool_recycle로 오래된 연결만 교체
+# - idle timeout이 짧은 환경이면 DB_POOL_RECYCLE_SEC를 300 정도로 낮춰서 대응
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+    pool_pre_ping=False,
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
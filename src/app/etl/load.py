@@ -1,34 +1,49 @@
 from __future__ import annotations
-import json
+import io
+import orjson
 import pandas as pd
-from sqlalchemy import text
+from psycopg2.extras import execute_values
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Any, Iterable
 from ..models import Ticker, Snapshot, MarketSnapshot, FundamentalSnapshot, DiscountRateSnapshot, SRimResult
 
+# data_quality(dict) 직렬화 옵션: numpy 스칼라 / 비문자열 키(json.dumps처럼 문자열화)도 허용
+_DQ_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
 
+# SW 관점: multi-row VALUES 한 문장당 행 수 상한
+# - PostgreSQL은 ~1k행 이후로 문장당 이득이 평탄해지고, 그 이상은 파싱/WAL 버퍼/메모리(batch × row 폭)만 커짐
+# - execute_values(page_size)와 UPDATE ... FROM VALUES 배치에 공통 적용(sync 엔진 insertmanyvalues_page_size도 동일 값)
+PG_BATCH_PAGE_SIZE = 1000
+
+# SW 관점: 트랜잭션 경계는 호출 측(run_etl의 stage 단위)이 소유
+# - 이 모듈의 upsert/update 함수는 commit하지 않음(stage 끝에서 한 번 commit → fsync/왕복 최소화)
 
 def upsert_snapshot(db: Session, snapshot_id: str, as_of: date, note: str | None = None):
-    obj = db.get(Snapshot, snapshot_id)
-    if obj is None:
-        obj = Snapshot(snapshot_id=snapshot_id, as_of_date=as_of, note=note)
-        db.add(obj)
-    else:
-        obj.as_of_date = as_of
-        obj.note = note
-    db.commit()
+    # SW 관점: db.get(SELECT) + add/UPDATE 대신 INSERT ... ON CONFLICT 한 문장(즉시 실행 → FK 참조 INSERT 가능)
+    stmt = pg_insert(Snapshot).values(snapshot_id=snapshot_id, as_of_date=as_of, note=note)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Snapshot.snapshot_id],
+        set_={"as_of_date": stmt.excluded.as_of_date, "note": stmt.excluded.note},
+    )
+    db.execute(stmt)
 
 
 def upsert_discount_rate(db: Session, snapshot_id: str, as_of: date, rate: float, source: str = "manual"):
-    obj = db.get(DiscountRateSnapshot, snapshot_id)
-    if obj is None:
-        obj = DiscountRateSnapshot(snapshot_id=snapshot_id, as_of_date=as_of, rate=rate, source=source)
-        db.add(obj)
-    else:
-        obj.as_of_date = as_of
-        obj.rate = rate
-        obj.source = source
-    db.commit()
+    stmt = pg_insert(DiscountRateSnapshot).values(
+        snapshot_id=snapshot_id, as_of_date=as_of, rate=rate, source=source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DiscountRateSnapshot.snapshot_id],
+        set_={
+            "as_of_date": stmt.excluded.as_of_date,
+            "rate": stmt.excluded.rate,
+            "source": stmt.excluded.source,
+        },
+    )
+    db.execute(stmt)
 
 
 def upsert_tickers(db: Session, tickers_df: pd.DataFrame):
@@ -36,17 +51,80 @@ def upsert_tickers(db: Session, tickers_df: pd.DataFrame):
     tickers 테이블 업서트
     입력 DF 컬럼: ticker, name, market
     """
-    sql = text("""
-        insert into tickers (ticker, name, market, last_seen_date)
-        values (:ticker, :name, :market, current_date)
-        on conflict (ticker) do update
-        set name = excluded.name,
-            market = excluded.market,
-            last_seen_date = excluded.last_seen_date
-    """)
-    rows = tickers_df[["ticker", "name", "market"]].to_dict(orient="records")
-    db.execute(sql, rows)
-    db.commit()
+    # SW 관점: dialect insert + executemany → insertmanyvalues가 page_size 단위 multi-row VALUES로 전송
+    stmt = pg_insert(Ticker).values(last_seen_date=func.current_date())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Ticker.ticker],
+        set_={
+            "name": stmt.excluded.name,
+            "market": stmt.excluded.market,
+            "last_seen_date": stmt.excluded.last_seen_date,
+        },
+    )
+    # SW 관점: to_dict("records")의 셀 단위 boxing 대신 컬럼 배열을 한 번씩 꺼내 zip
+    rows = [
+        {"ticker": t, "name": n, "market": m}
+        for t, n, m in zip(
+            tickers_df["ticker"].tolist(),
+            tickers_df["name"].tolist(),
+            tickers_df["market"].tolist(),
+        )
+    ]
+    if rows:
+        db.execute(stmt, rows)
+
+
+def _copy_upsert(
+    db: Session,
+    table: str,
+    df: pd.DataFrame,
+    columns: list[str],
+    conflict_cols: list[str],
+    *,
+    overrides: dict[str, Any] | None = None,
+    extra_updates: dict[str, str] | None = None,
+) -> None:
+    """
+    COPY → TEMP 스테이징 테이블 → INSERT ... SELECT ... ON CONFLICT DO UPDATE
+    overrides: df 대신 쓸 컬럼 값(스칼라 또는 행 수만큼의 시퀀스), 예: snapshot_id 상수
+    extra_updates: 충돌 시 추가로 SET할 컬럼 → SQL 식, 예: {"computed_at": "now()"}
+
+    SW 관점:
+    - 행 단위 INSERT 바인딩 대신 CSV 스트림 한 번(COPY)으로 적재 후, 업서트는 SQL 한 문장
+    - 세션의 현재 트랜잭션(psycopg2 커넥션)을 그대로 사용 → commit은 호출 측 정책을 따름
+    - CSV의 빈 값은 NULL로 적재(NaN/None/<NA> 모두 빈 값으로 기록됨)
+    - 입력 df 전체를 copy하지 않고, 필요한 컬럼만 선택한 프레임에 overrides 컬럼을 끼워 넣음
+    """
+    stage = f"_{table}_stage"
+    cols = ", ".join(columns)
+    updates = ",\n            ".join(
+        [f"{c} = excluded.{c}" for c in columns if c not in conflict_cols]
+        + [f"{c} = {expr}" for c, expr in (extra_updates or {}).items()]
+    )
+
+    overrides = overrides or {}
+    out = df[[c for c in columns if c not in overrides]]  # 컬럼 선택 = 새 프레임(원본 df는 변경 안 됨)
+    for i, c in enumerate(columns):
+        if c in overrides:
+            out.insert(i, c, overrides[c])
+
+    buf = io.StringIO()
+    out.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+
+    cur = db.connection().connection.cursor()
+    try:
+        cur.execute(f"drop table if exists {stage}")
+        cur.execute(f"create temp table {stage} (like {table} including defaults) on commit drop")
+        cur.copy_expert(f"copy {stage} ({cols}) from stdin with (format csv)", buf)
+        cur.execute(f"""
+            insert into {table} ({cols})
+            select {cols} from {stage}
+            on conflict ({", ".join(conflict_cols)}) do update
+            set {updates}
+        """)
+    finally:
+        cur.close()
 
 
 def upsert_market_snapshot(db: Session, snapshot_id: str, market_df: pd.DataFrame):
@@ -54,30 +132,96 @@ def upsert_market_snapshot(db: Session, snapshot_id: str, market_df: pd.DataFram
     market_snapshot 테이블 업서트
     입력 DF 컬럼: ticker, close_price, market_cap, shares_out
     """
-    sql = text("""
-        insert into market_snapshot (snapshot_id, ticker, close_price, market_cap, shares_out)
-        values (:snapshot_id, :ticker, :close_price, :market_cap, :shares_out)
-        on conflict (snapshot_id, ticker) do update
-        set close_price = excluded.close_price,
-            market_cap = excluded.market_cap,
-            shares_out = excluded.shares_out
-    """)
-    df = market_df.copy()
-    df["snapshot_id"] = snapshot_id
+    _copy_upsert(
+        db,
+        "market_snapshot",
+        market_df,
+        ["snapshot_id", "ticker", "close_price", "market_cap", "shares_out"],
+        ["snapshot_id", "ticker"],
+        overrides={"snapshot_id": snapshot_id},
+    )
+
+
+def update_market_shares(db: Session, snapshot_id: str, shares_map: dict, *, batch_size: int = PG_BATCH_PAGE_SIZE) -> int:
+    """
+    market_snapshot 주식수(shares_out/treasury_shares/float_shares) 일괄 UPDATE
+    입력: ticker -> {shares_out, treasury_shares, float_shares, ...} (shares_out 없는 종목은 건너뜀)
 
-    rows = df[["snapshot_id", "ticker", "close_price", "market_cap", "shares_out"]].to_dict(orient="records")
-    db.execute(sql, rows)
-    db.commit()
+    SW 관점:
+    - 종목별 UPDATE 왕복 대신 UPDATE ... FROM (VALUES ...) 한 문장으로 처리(batch_size 단위)
+    - 파라미터는 튜플 리스트로 한 번만 만들고 psycopg2 execute_values로 VALUES 전개
+    반환: 실제 갱신된 row 수
+    """
+    rows = [
+        (snapshot_id, tk, v["shares_out"], v.get("treasury_shares"), v.get("float_shares"))
+        for tk, v in shares_map.items()
+        if v.get("shares_out") is not None
+    ]
+    if not rows:
+        return 0
+
+    sql = """
+        update market_snapshot m
+           set shares_out = v.shares_out,
+               treasury_shares = v.treasury_shares,
+               float_shares = v.float_shares
+          from (values %s) as v(snapshot_id, ticker, shares_out, treasury_shares, float_shares)
+         where m.snapshot_id = v.snapshot_id
+           and m.ticker = v.ticker
+    """
+    # SW 관점: VALUES의 NULL은 text로 추론되므로 numeric으로 명시 cast
+    template = "(%s, %s, cast(%s as numeric), cast(%s as numeric), cast(%s as numeric))"
+
+    updated = 0
+    cur = db.connection().connection.cursor()
+    try:
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            # page_size=len(batch): 배치당 한 문장 → rowcount가 배치 전체 갱신 수
+            execute_values(
+                cur,
+                sql,
+                batch,
+                template=template,
+                page_size=len(batch),
+            )
+            updated += max(cur.rowcount or 0, 0)
+    finally:
+        cur.close()
 
+    return updated
+
+
+def upsert_fundamental_rows(
+    db: Session,
+    snapshot_id: str,
+    rows: Iterable[tuple],
+    *,
+    page_size: int = PG_BATCH_PAGE_SIZE,
+) -> int:
+    """
+    fundamental_snapshot 업서트(스트리밍, DataFrame 없이)
+    입력: (ticker, fs_year, report_code, is_consolidated, equity_parent, net_income_parent, data_quality(dict)) 튜플 iterable
 
-def upsert_fundamental_snapshot(db: Session, snapshot_id: str, fund_df: pd.DataFrame):
-    sql = text("""
+    SW 관점:
+    - 제너레이터를 그대로 execute_values에 넘겨 page_size 단위로 INSERT ... ON CONFLICT 전송
+    - 전체 행을 DataFrame/CSV 버퍼로 한 번 더 만들지 않음
+    반환: 전송한 row 수
+    """
+    n = 0
+
+    def _gen():
+        nonlocal n
+        for tk, fs_year, rc, is_cons, eq, ni, dq in rows:
+            n += 1
+            yield (snapshot_id, tk, fs_year, rc, is_cons, eq, ni,
+                   orjson.dumps(dq or {}, option=_DQ_ORJSON_OPTS).decode())
+
+    sql = """
         insert into fundamental_snapshot
-          (snapshot_id, ticker, fs_year, report_code, is_consolidated,
-           equity_parent, net_income_parent, data_quality)
-        values
-          (:snapshot_id, :ticker, :fs_year, :report_code, :is_consolidated,
-           :equity_parent, :net_income_parent, cast(:data_quality as jsonb))
+            (snapshot_id, ticker, fs_year, report_code, is_consolidated,
+             equity_parent, net_income_parent, data_quality)
+        values %s
         on conflict (snapshot_id, ticker) do update
         set fs_year = excluded.fs_year,
             report_code = excluded.report_code,
@@ -85,13 +229,14 @@ def upsert_fundamental_snapshot(db: Session, snapshot_id: str, fund_df: pd.DataF
             equity_parent = excluded.equity_parent,
             net_income_parent = excluded.net_income_parent,
             data_quality = excluded.data_quality
-    """)
-    df = fund_df.copy()
-    df["snapshot_id"] = snapshot_id
-    df["data_quality"] = df["data_quality"].apply(lambda x: json.dumps(x or {}, ensure_ascii=False))
-    rows = df[
-        ["snapshot_id", "ticker", "fs_year", "report_code", "is_consolidated",
-         "equity_parent", "net_income_parent", "data_quality"]
-    ].to_dict(orient="records")
-    db.execute(sql, rows)
-    db.commit()
+    """
+    # SW 관점: data_quality는 JSON 텍스트 → jsonb로 명시 cast
+    template = "(%s, %s, %s, %s, %s, %s, %s, cast(%s as jsonb))"
+
+    cur = db.connection().connection.cursor()
+    try:
+        execute_values(cur, sql, _gen(), template=template, page_size=page_size)
+    finally:
+        cur.close()
+
+    return n
@@ -16,10 +16,10 @@ Stage 정의:
 """
 
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, datetime
 
 import pandas as pd
-from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
@@ -29,14 +29,15 @@ from app.etl.sources_krx import fetch_kospi_universe
 from app.etl.sources_dart import (
     fetch_latest_annual_fundamentals,
     load_corpcode_df,
-    fetch_shares_out_for_tickers,
+    close_session as close_dart_session,
 )
 from app.etl.load import (
     upsert_snapshot,
     upsert_discount_rate,
     upsert_tickers,
     upsert_market_snapshot,
-    upsert_fundamental_snapshot,
+    upsert_fundamental_rows,
+    update_market_shares,
 )
 from app.etl.stage3_srim import run_stage3_srim
 
@@ -44,10 +45,13 @@ from app.etl.stage3_srim import run_stage3_srim
 # -----------------------------
 # Snapshot ID 규칙 (기존 그대로)
 # -----------------------------
+# month(1~12) -> 분기 (인덱스 0은 미사용)
+_QUARTER_OF_MONTH = (0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4)
+
+
 def snapshot_id_for(dt: date) -> str:
     """as_of_date 기준 분기 스냅샷 ID 생성 (예: 2026-01-04 -> 2026Q1)"""
-    q = (dt.month - 1) // 3 + 1
-    return f"{dt.year}Q{q}"
+    return f"{dt.year}Q{_QUARTER_OF_MONTH[dt.month]}"
 
 
 # -----------------------------
@@ -63,6 +67,7 @@ def stage0(db: Session, sid: str, as_of: date, *, r: float, note: str | None) ->
     """
     upsert_snapshot(db, sid, as_of, note=note)
     upsert_discount_rate(db, sid, as_of, rate=float(r), source="manual")
+    db.commit()  # SW 관점: stage 단위 트랜잭션
 
 
 def stage1(db: Session, sid: str, as_of: date) -> pd.DataFrame:
@@ -77,112 +82,103 @@ def stage1(db: Session, sid: str, as_of: date) -> pd.DataFrame:
 
     upsert_tickers(db, tickers_df)
     upsert_market_snapshot(db, sid, market_df)
+    db.commit()  # SW 관점: stage 단위 트랜잭션
 
     return market_df
 
 
+# 비정상 크기 제거 기준(|x| > MAX_ABS 또는 NaN/숫자 아님 → NULL)
+MAX_ABS = 1e18
+
+
+def _clamp_abs(x) -> float | None:
+    try:
+        v = float(x)
+    except (TypeError, ValueError):
+        return None
+    if v != v or abs(v) > MAX_ABS:
+        return None
+    return v
+
+
 def stage2(
     db: Session,
     sid: str,
     *,
     market_df: pd.DataFrame,
     dart_limit: int | None = None,
+    corp_df: pd.DataFrame | None = None,
 ) -> dict:
     """
     Stage2: DART 재무 + 주식수 보강
 
     - fundamental_snapshot 업서트
     - market_snapshot의 shares_out/treasury/float UPDATE
+    - corp_df: run()에서 Stage1과 병렬로 미리 로드한 corpCode (없으면 여기서 로드)
     """
     if not settings.DART_API_KEY:
         raise RuntimeError("DART_API_KEY is not set in .env")
 
-    # ticker 정규화(항상 6자리)
-    tickers_raw = market_df["ticker"].tolist()
-    tickers = [str(x).strip().zfill(6) for x in tickers_raw]
-    ticker_to_name = {
-        str(t).strip().zfill(6): n
-        for t, n in zip(tickers_raw, market_df["name"].tolist())
-    }
+    # ticker 정규화(항상 6자리) - SW 관점: str accessor로 한 번만 정규화 후 재사용
+    norm = market_df["ticker"].astype(str).str.strip().str.zfill(6)
+    tickers = norm.tolist()
+    ticker_to_name = dict(zip(tickers, market_df["name"].tolist()))
 
-    # 1) 재무(사업보고서 우선, 내부에서 fallback)
+    if corp_df is None:
+        corp_df = load_corpcode_df(settings.DART_API_KEY)
+
+    # 1) 재무(사업보고서 우선, 내부에서 fallback) + 2) 주식수
+    # SW 관점: 종목별로 재무 조회 직후 같은 worker에서 성공한 (year, report_code)부터 주식수 조회
+    # - 재무 루프와 주식수 루프를 따로 돌리지 않고 한 번의 스레드 병렬 패스로 처리
+    # - 스레드 수는 DART 조회 한도를 고려해 DART_MAX_WORKERS로 제한(1이면 순차)
+    shares_map: dict[str, dict] = {}
     fundamental_rows = fetch_latest_annual_fundamentals(
         api_key=settings.DART_API_KEY,
         tickers=tickers,
         ticker_to_name=ticker_to_name,
         max_companies=dart_limit,
-    )
-
-    # DART 주식수 fetch를 위한 preferred_year_report 구성(기존 그대로)
-    preferred_year_report = {}
-    for r in fundamental_rows:
-        if r.fs_year and r.report_code:
-            preferred_year_report[str(r.ticker).zfill(6)] = (int(r.fs_year), str(r.report_code))
-
-    corp_df = load_corpcode_df(settings.DART_API_KEY)
-
-    # 2) 주식수 (필요 시 limit 적용)
-    shares_target = tickers[:dart_limit] if dart_limit else tickers
-    shares_map = fetch_shares_out_for_tickers(
-        api_key=settings.DART_API_KEY,
-        tickers=shares_target,  # 이미 6자리 정규화된 리스트
         corp_df=corp_df,
-        ticker_to_name=ticker_to_name,
-        preferred_year_report=preferred_year_report,
+        max_workers=settings.DART_MAX_WORKERS,
+        shares_out=shares_map,
     )
 
-    # ---- shares_out UPDATE (기존 로직 유지) ----
-    updated = 0
-    for tk, v in shares_map.items():
-        if v.get("shares_out") is None:
-            continue
-
-        res = db.execute(
-            text("""
-                update market_snapshot
-                   set shares_out = :shares_out,
-                       treasury_shares = :treasury_shares,
-                       float_shares = :float_shares
-                 where snapshot_id = :snapshot_id
-                   and ticker = :ticker
-            """),
-            {
-                "snapshot_id": sid,
-                "ticker": tk,
-                "shares_out": v.get("shares_out"),
-                "treasury_shares": v.get("treasury_shares"),
-                "float_shares": v.get("float_shares"),
-            },
-        )
-        if getattr(res, "rowcount", 0) == 1:
-            updated += 1
-
-    db.commit()
+    # ---- shares_out UPDATE (UPDATE ... FROM VALUES 일괄 처리) ----
+    updated = update_market_shares(db, sid, shares_map)
     print(f"[stage2:shares_out] updated rows = {updated}")
 
-    # ---- fundamental_snapshot 업서트 준비 ----
-    fund_df = pd.DataFrame([r.__dict__ for r in fundamental_rows])
-
-    # pandas가 Int 컬럼을 float로 바꾸는 문제 방지(기존 그대로)
-    if "fs_year" in fund_df.columns:
-        fund_df["fs_year"] = pd.to_numeric(fund_df["fs_year"], errors="coerce").astype("Int64")
-
-    # 비정상 크기 제거(기존 그대로)
-    MAX_ABS = 1e18
-    for col in ["equity_parent", "net_income_parent"]:
-        if col in fund_df.columns:
-            fund_df[col] = pd.to_numeric(fund_df[col], errors="coerce")
-            fund_df.loc[fund_df[col].abs() > MAX_ABS, col] = None
-
-    upsert_fundamental_snapshot(db, sid, fund_df)
+    # ---- fundamental_snapshot 업서트 (DataFrame 없이 행 스트리밍) ----
+    fund_rows = upsert_fundamental_rows(
+        db,
+        sid,
+        (
+            (
+                r.ticker,
+                int(r.fs_year) if r.fs_year is not None else None,
+                r.report_code,
+                r.is_consolidated,
+                _clamp_abs(r.equity_parent),
+                _clamp_abs(r.net_income_parent),
+                r.data_quality,
+            )
+            for r in fundamental_rows
+        ),
+    )
+    db.commit()  # SW 관점: 주식수 UPDATE + 재무 업서트를 한 트랜잭션으로 확정
 
     return {
-        "fund_rows": int(len(fund_df)),
+        "fund_rows": int(fund_rows),
         "shares_updated": int(updated),
     }
 
 
-def stage3(db: Session, sid: str, *, persistence: float, clamp_negative_residual: bool) -> dict:
+def stage3(
+    db: Session,
+    sid: str,
+    *,
+    persistence: float,
+    clamp_negative_residual: bool,
+    engine: str = "python",
+) -> dict:
     """
     Stage3: S-RIM 계산
 
@@ -191,6 +187,7 @@ def stage3(db: Session, sid: str, *, persistence: float, clamp_negative_residual
       없으면 default_discount_rate로 fallback 함.
     - 따라서 Stage0를 실행하지 않아도 계산은 되지만,
       운영 정책상 'snapshot별 r 확정'을 위해 Stage0 실행을 권장.
+    - engine="sql"이면 계산/저장을 DB 한 문장(INSERT ... SELECT)으로 수행(python 경로와 같은 수식/flags)
     """
     srim_summary = run_stage3_srim(
         db=db,
@@ -198,6 +195,7 @@ def stage3(db: Session, sid: str, *, persistence: float, clamp_negative_residual
         default_discount_rate=float(settings.DEFAULT_DISCOUNT_RATE),
         persistence=float(persistence),
         clamp_negative_residual=bool(clamp_negative_residual),
+        engine=engine,
     )
     return srim_summary
 
@@ -215,10 +213,19 @@ def run(
     dart_limit: int | None,
     persistence: float,
     clamp_negative_residual: bool,
+    srim_engine: str = "python",
 ) -> dict:
     sid = snapshot_id or snapshot_id_for(as_of)
 
     db: Session = SessionLocal()
+
+    # SW 관점: corpCode 로드(HTTP + XML 파싱)는 Stage0/1과 독립적인 I/O → 스레드로 미리 시작해 겹침
+    pool: ThreadPoolExecutor | None = None
+    corp_future: Future | None = None
+    if 2 in stages and settings.DART_API_KEY:
+        pool = ThreadPoolExecutor(max_workers=1)
+        corp_future = pool.submit(load_corpcode_df, settings.DART_API_KEY)
+
     try:
         market_df: pd.DataFrame | None = None
 
@@ -233,12 +240,24 @@ def run(
             # 운영 단순화를 위해: Stage2 단독 실행은 막고, Stage1과 같이 실행하도록 유도
             if market_df is None:
                 raise RuntimeError("Stage2는 Stage1 결과(market_df)가 필요합니다. stages에 1을 포함하세요.")
-            stage2_summary = stage2(db, sid, market_df=market_df, dart_limit=dart_limit)
+            stage2_summary = stage2(
+                db,
+                sid,
+                market_df=market_df,
+                dart_limit=dart_limit,
+                corp_df=corp_future.result() if corp_future else None,
+            )
         else:
             stage2_summary = None
 
         if 3 in stages:
-            stage3_summary = stage3(db, sid, persistence=persistence, clamp_negative_residual=clamp_negative_residual)
+            stage3_summary = stage3(
+                db,
+                sid,
+                persistence=persistence,
+                clamp_negative_residual=clamp_negative_residual,
+                engine=srim_engine,
+            )
         else:
             stage3_summary = None
 
@@ -250,6 +269,13 @@ def run(
             "stage3": stage3_summary,
         }
     finally:
+        if pool is not None:
+            # SW 관점: 백그라운드 corpCode 로드가 공용 DART Session을 쓰고 있을 수 있으므로
+            # - 아직 시작 전이면 취소, 실행 중이면 끝날 때까지 기다린 뒤에 Session을 닫음
+            if corp_future is not None:
+                corp_future.cancel()
+            pool.shutdown(wait=True)
+        close_dart_session()
         db.close()
 
 
@@ -293,6 +319,12 @@ def main() -> None:
     # S-RIM 계산 옵션
     p.add_argument("--persistence", type=float, default=1.0, help="초과이익 지속계수(0~1), MVP 기본 1.0")
     p.add_argument("--no-clamp-negative-residual", action="store_true", help="음수 초과이익 클램프 비활성화(실험용)")
+    p.add_argument(
+        "--srim-engine",
+        choices=["python", "sql"],
+        default=settings.SRIM_ENGINE,
+        help="Stage3 계산 엔진(python: NumPy/numba, sql: DB 내 단일 INSERT ... SELECT)",
+    )
 
     args = p.parse_args()
 
@@ -308,6 +340,7 @@ def main() -> None:
         dart_limit=args.dart_limit,
         persistence=float(args.persistence),
         clamp_negative_residual=not bool(args.no_clamp_negative_residual),
+        srim_engine=args.srim_engine,
     )
 
     print(result)
@@ -1,15 +1,160 @@
 from __future__ import annotations
+import hashlib
+import os
+import re
 import zipfile
-import io
+import shutil
+import tempfile
+import threading
 import time
+import orjson
 import requests
 import pandas as pd
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 
 
-@dataclass
+# SW 관점: opendart.fss.or.kr 한 호스트에 수천 번 요청 → 모듈 공용 Session으로 keep-alive 연결 재사용
+# - 요청마다 TCP+TLS 핸드셰이크를 새로 하지 않음(urllib3 커넥션 풀)
+# - pool_maxsize는 DART_MAX_WORKERS 스레드가 동시에 써도 연결을 버리지 않을 만큼 확보
+# - 5xx·연결 오류는 어댑터 레벨에서 지수 backoff + jitter로 재시도(재시도 소진 시 응답을 그대로 돌려 raise_for_status로 처리)
+# - 429는 어댑터에서 재시도하지 않음: _dart_get이 토큰 버킷을 멈춘 뒤 acquire()를 거쳐 다시 요청
+# - DART status 013(데이터없음) 등 재시도 의미 없는 응답은 호출부에서 대기 없이 다음 후보로 넘어감
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            backoff_jitter=0.25,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷(초당 rate개 보충, 최대 capacity개 버스트)
+
+    SW 관점: 429를 맞고 재시도/backoff로 멈추는 대신 요청 전에 미리 속도를 맞춤
+    - acquire()는 토큰을 예약만 하고 lock 밖에서 대기(동시 스레드가 lock을 잡고 잠들지 않음)
+    - pause(sec): Retry-After 등 서버 지시만큼 이후 토큰 발급을 늦춤
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+# SW 관점: DART 한도(일 10,000건, 초당 ~10건 권장)보다 약간 낮게 선제 페이싱(모든 스레드 공유)
+DART_RATE_PER_SEC = 8
+DART_BURST = 16
+_DART_BUCKET = TokenBucket(rate=DART_RATE_PER_SEC, capacity=DART_BURST)
+
+
+# 429(요청 한도) 재시도 횟수 / Retry-After가 없을 때의 기본 대기(초, 시도마다 2배)
+DART_429_RETRIES = 5
+DART_429_BACKOFF_SEC = 1.0
+
+
+def _dart_get(url: str, params: dict, **kwargs) -> requests.Response:
+    """
+    DART GET 공통 경로: 토큰 버킷 통과 후 요청
+
+    - 429 응답이면 Retry-After(없으면 지수 backoff)만큼 버킷을 멈추고, 다시 acquire()를 거쳐 재요청
+      → 모든 스레드의 이후 요청이 함께 늦춰짐(재시도가 버킷을 우회하지 않음)
+    - 재시도 소진 시 마지막 429 응답을 그대로 반환(호출부 raise_for_status로 처리)
+    """
+    for attempt in range(DART_429_RETRIES + 1):
+        _DART_BUCKET.acquire()
+        resp = _SESSION.get(url, params=params, **kwargs)
+        if resp.status_code != 429 or attempt == DART_429_RETRIES:
+            return resp
+        try:
+            wait = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            wait = DART_429_BACKOFF_SEC * (2 ** attempt)
+        resp.close()
+        _DART_BUCKET.pause(wait)
+    return resp
+
+
+# SW 관점: 재실행/개발 반복 시 같은 (corp_code, 연도, 보고서, fs_div) 응답을 네트워크 대신 디스크에서 재생
+# - 정상 응답(status=000)만 저장(013 데이터없음/020 한도초과 등은 나중에 바뀔 수 있으므로 매번 조회)
+# - 정정공시로 수치가 바뀔 수 있으므로 DART_CACHE_TTL_SEC가 지난 파일은 다시 조회해 덮어씀
+#   (None이면 캐시 비활성, 강제 갱신은 디렉터리 삭제)
+DART_CACHE_DIR: Path | None = Path("data/.dart_cache")
+DART_CACHE_TTL_SEC = 7 * 24 * 3600
+
+
+def _dart_cache_path(url: str, params: dict) -> Path | None:
+    if DART_CACHE_DIR is None:
+        return None
+    endpoint = url.rsplit("/", 1)[-1].split(".", 1)[0]
+    # 키는 이름=값 쌍으로 구성(값만 이으면 서로 다른 파라미터 조합이 같은 파일로 충돌), api_key는 제외
+    query = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if k != "crtfc_key")
+    return DART_CACHE_DIR / endpoint / f"{hashlib.sha1(query.encode()).hexdigest()}.json"
+
+
+def _dart_get_json(url: str, params: dict, *, cache: bool = True) -> dict:
+    """DART JSON 조회(디스크 캐시 우선, cache=False면 항상 조회). 반환은 디코드된 응답 dict(status 검사는 호출부)"""
+    path = _dart_cache_path(url, params) if cache else None
+    if path is not None:
+        try:
+            if time.time() - path.stat().st_mtime < DART_CACHE_TTL_SEC:
+                return orjson.loads(path.read_bytes())
+        except (OSError, ValueError):
+            pass
+
+    r = _dart_get(url, params, timeout=60)
+    r.raise_for_status()
+    data = orjson.loads(r.content)  # SW 관점: stdlib json(r.json()) 대신 orjson 디코드
+
+    if path is not None and data.get("status") == "000":
+        # 임시 파일에 쓰고 교체(atomic) → 중간에 끊기거나 스레드가 겹쳐도 깨진 JSON이 남지 않음
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(r.content)
+        os.replace(tmp, path)
+    return data
+
+
+def close_session() -> None:
+    """모듈 공용 HTTP Session의 커넥션 풀 정리(배치 종료 시 호출, 이후 요청은 새 연결로 동작)"""
+    _SESSION.close()
+
+
+@dataclass(slots=True)  # SW 관점: 수천 건 생성되는 행 객체라 __dict__ 없이 slot 저장
 class FundamentalRow:
     ticker: str
     fs_year: Optional[int]
@@ -20,13 +165,27 @@ class FundamentalRow:
     data_quality: dict
 
 
+# 보고서 코드 fallback 순서: 연간(11011) -> 3Q(11014) -> 반기(11012) -> 1Q(11013)
+REPRT_CODES = ("11011", "11014", "11012", "11013")
+
+
+def candidate_fs_years(today: date | None = None) -> list[int]:
+    """
+    재무/주식수 조회 연도 후보: (올해-2) -> (올해-3) -> (올해-1) (연초 대응)
+    SW 관점: 모듈 import 시점이 아니라 호출 시점의 날짜 기준(장시간 실행 프로세스에서도 연도 경계 반영)
+    """
+    y = (today or date.today()).year
+    return [y - 2, y - 3, y - 1]
+
+
 def _safe_float(x) -> Optional[float]:
+    # SW 관점: 숫자/쉼표 없는 문자열은 float() 한 번에 처리, 실패 시에만 쉼표 제거 후 재시도
     try:
-        if x is None:
-            return None
-        if isinstance(x, str):
-            x = x.replace(",", "").strip()
         return float(x)
+    except Exception:
+        pass
+    try:
+        return float(x.replace(",", ""))
     except Exception:
         return None
 
@@ -34,30 +193,95 @@ def _safe_float(x) -> Optional[float]:
 def load_corpcode_df(api_key: str, cache_path: str = "data/corpCode.xml") -> pd.DataFrame:
     """
     DART corpCode.xml (zip) 다운로드 후 캐시. DataFrame 로드.
+
+    SW 관점:
+    - 파싱 결과는 월 단위 pickle(corpCode_YYYYMM.pkl)로 디스크 캐시 → 재실행 시 XML 파싱 생략
+    - 같은 프로세스 안에서는 lru_cache로 DataFrame 자체를 재사용(stage2에서 여러 번 호출됨)
+    - 반환 DataFrame은 공유 객체이므로 호출 측에서 수정하지 않는다(조회 전용)
     """
+    return _load_corpcode_df_cached(api_key, cache_path, date.today().strftime("%Y%m"))
+
+
+@lru_cache(maxsize=4)
+def _load_corpcode_df_cached(api_key: str, cache_path: str, bucket: str) -> pd.DataFrame:
     p = Path(cache_path)
     p.parent.mkdir(parents=True, exist_ok=True)
 
+    pkl = p.with_name(f"{p.stem}_{bucket}.pkl")
+    if pkl.exists():
+        return pd.read_pickle(pkl)
+
     if not p.exists():
-        url = "https://opendart.fss.or.kr/api/corpCode.xml"
-        resp = requests.get(url, params={"crtfc_key": api_key}, timeout=60)
-        resp.raise_for_status()
+        _download_corpcode_xml(api_key, p)
+
+    df = _parse_corpcode_xml(p)
+    df.to_pickle(pkl)
+    return df
 
-        z = zipfile.ZipFile(io.BytesIO(resp.content))
-        xml_name = z.namelist()[0]
-        p.write_bytes(z.read(xml_name))
 
-    df = pd.read_xml(p)
-    if not {"corp_code", "corp_name", "stock_code"}.issubset(set(df.columns)):
-        raise RuntimeError(f"Unexpected corpCode.xml columns: {df.columns.tolist()}")
+def _download_corpcode_xml(api_key: str, dest: Path) -> None:
+    """
+    corpCode.xml(zip) 다운로드 → dest에 XML 저장
 
-    df["stock_code"] = df["stock_code"].astype(str).str.strip()
-    df["corp_name"] = df["corp_name"].astype(str).str.strip()
-    df = df[df["stock_code"].str.len() > 0].copy()
+    SW 관점: resp.content + BytesIO(ZIP 전체를 메모리에 두 벌) 대신
+    응답을 청크 단위로 임시 파일에 흘려 쓰고, ZIP 안의 XML도 스트림으로 dest에 복사
+    """
+    url = "https://opendart.fss.or.kr/api/corpCode.xml"
+    with tempfile.NamedTemporaryFile(suffix=".zip", dir=dest.parent, delete=False) as tmp:
+        zpath = Path(tmp.name)
+        try:
+            with _dart_get(url, {"crtfc_key": api_key}, stream=True, timeout=60) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_content(chunk_size=1 << 20):
+                    tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            zpath.unlink(missing_ok=True)
+            raise
+
+    part = dest.with_name(dest.name + ".part")  # 중간 실패 시 불완전한 XML이 캐시로 남지 않도록 교체 방식
+    try:
+        with zipfile.ZipFile(zpath) as z, z.open(z.namelist()[0]) as src, open(part, "wb") as out:
+            shutil.copyfileobj(src, out, length=1 << 20)
+        os.replace(part, dest)
+    finally:
+        zpath.unlink(missing_ok=True)
+        part.unlink(missing_ok=True)
 
-    df["corp_code"] = df["corp_code"].astype(str).str.strip().str.zfill(8)
-    df["stock_code"] = df["stock_code"].astype(str).str.strip().str.zfill(6)
-    return df
+
+_CORPCODE_FIELDS = ("corp_code", "corp_name", "stock_code", "modify_date")
+
+
+def _parse_corpcode_xml(p: Path) -> pd.DataFrame:
+    """
+    corpCode.xml(<result><list>...</list>...</result>)을 <list> 단위로 스트리밍 파싱
+    상장사(stock_code 있음)만 남기고 corp_code 8자리 / stock_code 6자리로 정규화
+
+    SW 관점:
+    - pd.read_xml은 전체 DOM을 만든 뒤 DataFrame으로 변환 → 큰 파일에서 느리고 메모리 사용이 큼
+    - iterparse로 <list>가 끝날 때마다 값만 튜플로 꺼내고 요소를 정리 → 메모리는 행 수에 비례
+    - strip/zfill/비상장 필터를 행을 꺼낼 때 한 번에 처리 → DataFrame 문자열 컬럼 재순회 없음
+    - 값은 문자열 그대로 유지 → corp_code/stock_code 앞자리 0이 숫자 변환으로 사라지지 않음
+    """
+    rows: list[tuple] = []
+    n_list = 0
+    for _, el in etree.iterparse(str(p), events=("end",), tag="list"):
+        n_list += 1
+        stock_code = (el.findtext("stock_code") or "").strip()
+        if stock_code:
+            rows.append((
+                (el.findtext("corp_code") or "").strip().zfill(8),
+                (el.findtext("corp_name") or "").strip(),
+                stock_code.zfill(6),
+                (el.findtext("modify_date") or "").strip(),
+            ))
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+    if not n_list:
+        raise RuntimeError(f"Unexpected corpCode.xml: no <list> elements in {p}")
+    return pd.DataFrame.from_records(rows, columns=list(_CORPCODE_FIELDS))
 
 
 def _guess_common_stock_code(ticker: str) -> Optional[str]:
@@ -67,22 +291,32 @@ def _guess_common_stock_code(ticker: str) -> Optional[str]:
     return ticker[:5] + "0"
 
 
-def resolve_corp_code(corp_df: pd.DataFrame, ticker: str, ticker_name: Optional[str] = None) -> Optional[str]:
-    m = corp_df[corp_df["stock_code"] == ticker]
-    if len(m) > 0:
-        return m.iloc[0]["corp_code"]
+def build_corp_code_map(corp_df: pd.DataFrame) -> dict[str, str]:
+    """
+    stock_code -> corp_code dict (같은 stock_code가 여러 행이면 첫 행 우선, 기존 iloc[0]과 동일)
+
+    SW 관점: 종목마다 corp_df 전체 Boolean mask 스캔(O(M)) 대신 dict 한 번 구성 후 해시 조회
+    """
+    code_map: dict[str, str] = {}
+    for sc, cc in zip(corp_df["stock_code"].tolist(), corp_df["corp_code"].tolist()):
+        code_map.setdefault(sc, cc)
+    return code_map
+
+
+def resolve_corp_code(code_map: dict[str, str], ticker: str, ticker_name: Optional[str] = None) -> Optional[str]:
+    corp_code = code_map.get(ticker)
+    if corp_code:
+        return corp_code
 
     common = _guess_common_stock_code(ticker)
     if common:
-        m2 = corp_df[corp_df["stock_code"] == common]
-        if len(m2) > 0:
-            return m2.iloc[0]["corp_code"]
+        return code_map.get(common)
 
     # ticker_name 기반 매칭은 일단 생략(MVP), 필요시 추가 가능
     return None
 
 
-def dart_fnltt_all(api_key: str, corp_code: str, bsns_year: int, reprt_code: str, fs_div: str) -> pd.DataFrame:
+def dart_fnltt_all(api_key: str, corp_code: str, bsns_year: int, reprt_code: str, fs_div: str) -> list[dict]:
     """
     DART 재무제표(전체 계정) 공식 API:
     /api/fnlttSinglAcntAll.json
@@ -96,6 +330,8 @@ def dart_fnltt_all(api_key: str, corp_code: str, bsns_year: int, reprt_code: str
     fs_div:
       CFS 연결
       OFS 별도
+
+    반환: 응답의 list(계정 레코드 dict 리스트). 값 추출은 계정명 선형 스캔뿐이라 DataFrame 변환 생략
     """
     url = "https://opendart.fss.or.kr/api/fnlttSinglAcntAll.json"
     params = {
@@ -105,42 +341,111 @@ def dart_fnltt_all(api_key: str, corp_code: str, bsns_year: int, reprt_code: str
         "reprt_code": reprt_code,
         "fs_div": fs_div,
     }
-    r = requests.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    data = r.json()
+    data = _dart_get_json(url, params)
 
     status = data.get("status")
     if status != "000":
         # 예: 013(데이터없음), 020(조회한도) 등
         raise RuntimeError(f"DART status={status}, message={data.get('message')}")
 
-    lst = data.get("list") or []
-    return pd.DataFrame(lst)
+    return data.get("list") or []
 
 
-def _pick_value_from_dart_df(df: pd.DataFrame, account_nm_keys: list[str]) -> Optional[float]:
+_REPORT_NM_RE = re.compile(r"(사업|반기|분기)보고서\s*\((\d{4})\.(\d{2})\)")
+
+
+def _report_keys_from_name(report_nm: str) -> set[tuple[int, str]]:
+    """
+    공시 보고서명("[기재정정]사업보고서 (2023.12)" 등) → (사업연도, reprt_code) 후보
+    - 12월 결산이면 정확히 한 건, 결산월이 다르면 사업연도/분기 구분이 모호하므로 가능한 조합을 모두 포함(누락 방지)
+    """
+    m = _REPORT_NM_RE.search(report_nm or "")
+    if not m:
+        return set()
+    kind, yy, mm = m.group(1), int(m.group(2)), m.group(3)
+    if kind == "사업":
+        codes, exact = ("11011",), mm == "12"
+    elif kind == "반기":
+        codes, exact = ("11012",), mm == "06"
+    elif mm in ("03", "09"):
+        codes, exact = ("11013" if mm == "03" else "11014",), True
+    else:
+        codes, exact = ("11013", "11014"), False
+    years = (yy,) if exact else (yy, yy - 1)
+    return {(y, rc) for y in years for rc in codes}
+
+
+@lru_cache(maxsize=4096)
+def dart_available_reports(api_key: str, corp_code: str, since_year: int) -> frozenset[tuple[int, str]] | None:
+    """
+    DART 공시검색(list.json, 정기공시 A)으로 since_year 이후 실제 제출된 (사업연도, reprt_code) 집합
+    - 조회 실패 시 None(호출부는 거르지 않고 전체 후보를 시도), 013(공시 없음)은 빈 집합
+    - 재무/주식수 조회가 같은 corp_code에 대해 공유하도록 프로세스 내 캐시(디스크 캐시는 새 공시 때문에 사용 안 함)
+    """
+    url = "https://opendart.fss.or.kr/api/list.json"
+    params = {
+        "crtfc_key": api_key,
+        "corp_code": corp_code,
+        "bgn_de": f"{since_year}0101",
+        "end_de": date.today().strftime("%Y%m%d"),
+        "pblntf_ty": "A",
+        "last_reprt_at": "Y",
+        "page_count": "100",
+    }
+    try:
+        data = _dart_get_json(url, params, cache=False)
+    except Exception:
+        return None
+    status = data.get("status")
+    if status == "013":
+        return frozenset()
+    if status != "000":
+        return None
+
+    if int(data.get("total_page") or 1) > 1:
+        return None  # 100건 초과(일반적이지 않음)는 일부만 보고 거르지 않도록 필터 포기
+
+    keys: set[tuple[int, str]] = set()
+    for rec in data.get("list") or []:
+        keys |= _report_keys_from_name(rec.get("report_nm"))
+    return frozenset(keys)
+
+
+def _pick_value_from_dart_list(lst: list[dict], account_nm_keys: list[str]) -> Optional[float]:
     """
     DART JSON list는 보통 account_nm / thstrm_amount 같은 키를 가짐.
+
+    SW 관점: DataFrame 변환 없이 레코드(dict) 리스트를 직접 선형 스캔
+    - 금액 키는 레코드 중 하나라도 가진 첫 후보(기존 DataFrame 컬럼 선택과 동일)
+    - key 우선순위 유지, key마다 정확 일치 → 부분 일치(행 순서상 첫 매칭) 순
     """
-    if df is None or len(df) == 0:
+    if not lst:
         return None
-    if "account_nm" not in df.columns:
+    if not any("account_nm" in rec for rec in lst):
         return None
 
     # 금액 컬럼 후보(케이스별로 다름)
     amt_col = None
     for c in ["thstrm_amount", "thstrm_add_amount", "amount"]:
-        if c in df.columns:
+        if any(c in rec for rec in lst):
             amt_col = c
             break
     if not amt_col:
         return None
 
-    s = df["account_nm"].astype(str)
+    # SW 관점: 계정명 → 금액 dict(같은 계정명은 첫 행)로 정확 일치를 먼저 조회
+    # - 정확 일치가 없을 때만 부분 문자열 스캔(더 긴 계정명 안의 우연한 부분 일치 방지)
+    names = [str(rec.get("account_nm") or "") for rec in lst]
+    lookup: dict[str, object] = {}
+    for nm, rec in zip(names, lst):
+        lookup.setdefault(nm, rec.get(amt_col))
+
     for key in account_nm_keys:
-        m = df[s.str.contains(key, na=False)]
-        if len(m) > 0:
-            return _safe_float(m.iloc[0][amt_col])
+        if key in lookup:
+            return _safe_float(lookup[key])
+        for nm, rec in zip(names, lst):
+            if key in nm:
+                return _safe_float(rec.get(amt_col))
     return None
 
 
@@ -149,6 +454,9 @@ def fetch_latest_annual_fundamentals(
     tickers: list[str],
     ticker_to_name: dict[str, str] | None = None,
     max_companies: int | None = None,
+    corp_df: pd.DataFrame | None = None,
+    max_workers: int = 1,
+    shares_out: dict[str, dict] | None = None,
 ) -> list[FundamentalRow]:
     """
     DART 재무를 최대한 넓게 가져오기 위한 MVP:
@@ -157,30 +465,30 @@ def fetch_latest_annual_fundamentals(
     - 보고서 코드 reprt_code는 연간(11011) -> 3Q(11014) -> 반기(11012) -> 1Q(11013) 순으로 fallback
     - 연도는 (current_year-2) -> (current_year-3) -> (current_year-1) 순으로 fallback (연초 대응)
     - 연결(CFS) 우선, 실패 시 별도(OFS) fallback
+    - max_workers > 1이면 종목 단위로 스레드 병렬 조회(결과 순서는 입력 순서 유지)
+    - shares_out(dict)을 주면 재무 조회 직후 같은 worker에서 주식수도 조회해 채움
+      (fetch_shares_out_for_tickers + preferred_year_report와 같은 결과, 별도 2차 루프 없음)
     """
 
     # 0) ticker 타입/포맷 방어: 항상 "6자리 문자열"로 통일
     tickers_norm = [str(x).strip().zfill(6) for x in tickers]
 
-    # 1) 기준 연도 계산 (candidate_years보다 먼저!)
-    from datetime import date as _date
-    current_year = _date.today().year
+    # 1~2) 보고서/연도 후보(호출당 한 번 계산, 재무/주식수 조회가 같은 후보를 공유)
+    reprt_codes = list(REPRT_CODES)
+    candidate_years = candidate_fs_years()
 
-    # 2) 보고서/연도 후보
-    reprt_codes = ["11011", "11014", "11012", "11013"]  # 연간 -> 3Q -> 반기 -> 1Q
-    candidate_years = [current_year - 2, current_year - 3, current_year - 1]
-
-    # 3) corpCode 로드
-    corp_df = load_corpcode_df(api_key)
+    # 3) corpCode 로드(호출 측에서 미리 로드했으면 재사용)
+    if corp_df is None:
+        corp_df = load_corpcode_df(api_key)
+    code_map = build_corp_code_map(corp_df)
 
     # 4) 실행 범위(테스트 limit)
     use_tickers = tickers_norm[:max_companies] if max_companies else tickers_norm
-    results: list[FundamentalRow] = []
 
     # 5) 기본값(에러/스킵 케이스에서 report_code 필드 채우기용)
     default_report_code = "11011"
 
-    for tk in use_tickers:
+    def _fetch_fund(tk: str) -> FundamentalRow:
         # 루프에서도 한 번 더 정규화(이중 안전장치)
         tk = str(tk).strip().zfill(6)
 
@@ -188,120 +496,110 @@ def fetch_latest_annual_fundamentals(
 
         # ticker 정합성: DART stock_code 매칭은 "6자리 숫자"가 가장 안정적
         if not (len(tk) == 6 and tk.isdigit()):
-            results.append(
-                FundamentalRow(
-                    ticker=tk,
-                    fs_year=None,
-                    report_code=default_report_code,
-                    is_consolidated=None,
-                    equity_parent=None,
-                    net_income_parent=None,
-                    data_quality={"FLAG_BAD_TICKER": True, "name": name},
-                )
+            return FundamentalRow(
+                ticker=tk,
+                fs_year=None,
+                report_code=default_report_code,
+                is_consolidated=None,
+                equity_parent=None,
+                net_income_parent=None,
+                data_quality={"FLAG_BAD_TICKER": True, "name": name},
             )
-            continue
 
-        corp_code = resolve_corp_code(corp_df, tk, name)
+        corp_code = resolve_corp_code(code_map, tk, name)
         if not corp_code:
-            results.append(
-                FundamentalRow(
-                    ticker=tk,
-                    fs_year=None,
-                    report_code=default_report_code,
-                    is_consolidated=None,
-                    equity_parent=None,
-                    net_income_parent=None,
-                    data_quality={"FLAG_NO_CORP_CODE": True, "name": name},
-                )
+            return FundamentalRow(
+                ticker=tk,
+                fs_year=None,
+                report_code=default_report_code,
+                is_consolidated=None,
+                equity_parent=None,
+                net_income_parent=None,
+                data_quality={"FLAG_NO_CORP_CODE": True, "name": name},
             )
-            continue
 
         picked_year: int | None = None
-        fs_df = None
+        fs_list = None
         flags: dict = {}
         found = False
 
-        # 보고서 코드 -> 연도 -> (CFS/OFS) 순으로 탐색
-        for rc in reprt_codes:
-            # 연결(CFS) 우선
-            for y in candidate_years:
-                try:
-                    fs_df = dart_fnltt_all(api_key, corp_code, y, rc, fs_div="CFS")
-                    if fs_df is not None and len(fs_df) > 0:
-                        picked_year = y
-                        flags["is_consolidated"] = True
-                        flags["report_code_used"] = rc
-                        found = True
-                        break
-                except Exception as e:
-                    # 마지막 에러만 남기되, 디버깅용으로 report/year도 같이 남김
-                    flags["LAST_ERR_CFS"] = f"{type(e).__name__}: {e}"
-                    flags["LAST_TRY_CFS"] = {"year": y, "reprt_code": rc}
-                    time.sleep(0.2)
-            if found:
-                break
-
-            # 별도(OFS) fallback
-            for y in candidate_years:
-                try:
-                    fs_df = dart_fnltt_all(api_key, corp_code, y, rc, fs_div="OFS")
-                    if fs_df is not None and len(fs_df) > 0:
-                        picked_year = y
-                        flags["is_consolidated"] = False
-                        flags["report_code_used"] = rc
-                        found = True
-                        break
-                except Exception as e:
-                    flags["LAST_ERR_OFS"] = f"{type(e).__name__}: {e}"
-                    flags["LAST_TRY_OFS"] = {"year": y, "reprt_code": rc}
-                    time.sleep(0.2)
-            if found:
-                break
+        # 보고서 코드 -> (CFS 연도들 -> OFS 연도들) 순으로 탐색
+        # SW 관점: 첫 후보가 실패하면 제출 보고서 목록(list.json)을 한 번 조회해 없는 (연도, 보고서)는 건너뜀
+        tries = [(rc, fs_div, y) for rc in reprt_codes for fs_div in ("CFS", "OFS") for y in candidate_years]
+        available: frozenset[tuple[int, str]] | None = None
+        for i, (rc, fs_div, y) in enumerate(tries):
+            if i and available is None:
+                available = dart_available_reports(api_key, corp_code, min(candidate_years))
+            if available is not None and (y, rc) not in available:
+                continue
+            try:
+                fs_list = dart_fnltt_all(api_key, corp_code, y, rc, fs_div=fs_div)
+                if fs_list:
+                    picked_year = y
+                    flags["is_consolidated"] = fs_div == "CFS"
+                    flags["report_code_used"] = rc
+                    found = True
+                    break
+            except Exception as e:
+                # 마지막 에러만 남기되, 디버깅용으로 report/year도 같이 남김
+                flags[f"LAST_ERR_{fs_div}"] = f"{type(e).__name__}: {e}"
+                flags[f"LAST_TRY_{fs_div}"] = {"year": y, "reprt_code": rc}
 
-        if not found or fs_df is None or len(fs_df) == 0:
-            results.append(
-                FundamentalRow(
-                    ticker=tk,
-                    fs_year=None,
-                    report_code=default_report_code,
-                    is_consolidated=flags.get("is_consolidated"),
-                    equity_parent=None,
-                    net_income_parent=None,
-                    data_quality={"FLAG_NO_FS": True, **flags, "name": name},
-                )
+        if not found or not fs_list:
+            return FundamentalRow(
+                ticker=tk,
+                fs_year=None,
+                report_code=default_report_code,
+                is_consolidated=flags.get("is_consolidated"),
+                equity_parent=None,
+                net_income_parent=None,
+                data_quality={"FLAG_NO_FS": True, **flags, "name": name},
             )
-            continue
 
         # ---- 값 추출 ----
         # 지배주주지분 우선, 없으면 자본총계 대체
-        equity_parent = _pick_value_from_dart_df(fs_df, ["지배기업소유주지분", "지배주주지분"])
+        equity_parent = _pick_value_from_dart_list(fs_list, ["지배기업소유주지분", "지배주주지분"])
         if equity_parent is None:
-            equity_total = _pick_value_from_dart_df(fs_df, ["자본총계"])
+            equity_total = _pick_value_from_dart_list(fs_list, ["자본총계"])
             equity_parent = equity_total
             if equity_total is not None:
                 flags["FLAG_EQUITY_SUB_TOTAL_EQUITY"] = True
 
         # 지배주주순이익 우선, 없으면 당기순이익 대체
-        ni_parent = _pick_value_from_dart_df(fs_df, ["지배기업소유주지분당기순이익", "지배주주순이익"])
+        ni_parent = _pick_value_from_dart_list(fs_list, ["지배기업소유주지분당기순이익", "지배주주순이익"])
         if ni_parent is None:
-            ni_total = _pick_value_from_dart_df(fs_df, ["당기순이익"])
+            ni_total = _pick_value_from_dart_list(fs_list, ["당기순이익"])
             ni_parent = ni_total
             if ni_total is not None:
                 flags["FLAG_NI_SUB_NET_INCOME"] = True
 
-        results.append(
-            FundamentalRow(
-                ticker=tk,
-                fs_year=picked_year,
-                report_code=flags.get("report_code_used", default_report_code),
-                is_consolidated=flags.get("is_consolidated"),
-                equity_parent=equity_parent,
-                net_income_parent=ni_parent,
-                data_quality=flags,
-            )
+        return FundamentalRow(
+            ticker=tk,
+            fs_year=picked_year,
+            report_code=flags.get("report_code_used", default_report_code),
+            is_consolidated=flags.get("is_consolidated"),
+            equity_parent=equity_parent,
+            net_income_parent=ni_parent,
+            data_quality=flags,
         )
 
-    return results
+    def _fetch_one(tk: str) -> FundamentalRow:
+        row = _fetch_fund(tk)
+        if shares_out is not None:
+            # 재무에서 성공한 (year, report_code)부터 주식수 조회 → 대부분 첫 시도에서 끝남
+            preferred = (int(row.fs_year), str(row.report_code)) if row.fs_year and row.report_code else None
+            name = ticker_to_name.get(row.ticker) if ticker_to_name else None
+            shares_out[row.ticker] = _fetch_shares_one(
+                api_key, row.ticker, code_map, name, preferred, reprt_codes, candidate_years
+            )
+        return row
+
+    # SW 관점: 종목별 DART 호출(최대 24회 fallback)은 네트워크 대기가 대부분 → 스레드 병렬(I/O bound)
+    # - max_workers=1이면 기존처럼 순차, ex.map은 입력 순서대로 결과 반환
+    if max_workers <= 1:
+        return [_fetch_one(tk) for tk in use_tickers]
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(_fetch_one, use_tickers))
 
 
 def dart_stock_total_status(api_key: str, corp_code: str, bsns_year: int, reprt_code: str) -> pd.DataFrame:
@@ -316,9 +614,7 @@ def dart_stock_total_status(api_key: str, corp_code: str, bsns_year: int, reprt_
         "bsns_year": str(bsns_year),
         "reprt_code": reprt_code,
     }
-    r = requests.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    data = r.json()
+    data = _dart_get_json(url, params)
 
     if data.get("status") != "000":
         raise RuntimeError(f"DART status={data.get('status')}, message={data.get('message')}")
@@ -326,17 +622,6 @@ def dart_stock_total_status(api_key: str, corp_code: str, bsns_year: int, reprt_
     return pd.DataFrame(data.get("list") or [])
 
 
-def _to_num(x) -> Optional[float]:
-    try:
-        if x is None:
-            return None
-        if isinstance(x, str):
-            x = x.replace(",", "").strip()
-        return float(x)
-    except Exception:
-        return None
-
-
 def pick_issued_shares(df: pd.DataFrame) -> tuple[Optional[float], Optional[float], Optional[float]]:
     """
     df(list)에서 발행주식수(istc_totqy), 자기주식수(tesstk_co), 유통주식수(distb_stock_co) 추출.
@@ -350,22 +635,88 @@ def pick_issued_shares(df: pd.DataFrame) -> tuple[Optional[float], Optional[floa
 
     # 후보: se(구분), stock_knd(종류) 같은 컬럼이 있을 수도 있음
     # 여기서는 "보통" 문자열이 들어있는 행을 우선 선택
-    pick = None
+    # SW 관점: 필터링된 DataFrame/행 Series를 만들지 않고 행 위치만 구해 iat로 스칼라 조회
+    pos = 0
     for col in ["se", "stock_knd", "stck_knd", "class", "reprt_ty"]:
         if col in cols:
-            m = df[df[col].astype(str).str.contains("보통", na=False)]
-            if len(m) > 0:
-                pick = m.iloc[0]
+            hits = df[col].astype(str).str.contains("보통", regex=False).to_numpy()
+            if hits.any():
+                pos = int(hits.argmax())
                 break
-    if pick is None:
-        pick = df.iloc[0]
 
-    issued = _to_num(pick.get("istc_totqy"))
-    treasury = _to_num(pick.get("tesstk_co"))
-    float_sh = _to_num(pick.get("distb_stock_co"))
+    def _cell(c: str) -> Optional[float]:
+        return _safe_float(df.iat[pos, df.columns.get_loc(c)]) if c in cols else None
+
+    issued = _cell("istc_totqy")
+    treasury = _cell("tesstk_co")
+    float_sh = _cell("distb_stock_co")
     return issued, treasury, float_sh
 
 
+def _fetch_shares_one(
+    api_key: str,
+    tk: str,
+    code_map: dict[str, str],
+    name: Optional[str],
+    preferred: tuple[int, str] | None,
+    reprt_codes: list[str],
+    candidate_years: list[int],
+) -> dict:
+    """ticker 1건의 {shares_out, treasury_shares, float_shares, data_quality}"""
+    corp_code = resolve_corp_code(code_map, tk, name)
+    if not corp_code:
+        return {"shares_out": None, "treasury_shares": None, "float_shares": None,
+                "data_quality": {"FLAG_NO_CORP_CODE": True, "name": name}}
+
+    flags = {"name": name}
+    found = False
+    issued = treasury = float_sh = None
+
+    # fundamentals에서 성공한 year/report가 있으면 그 조합부터 시도
+    first_tries = []
+    if preferred:
+        first_tries.append(preferred)
+
+    # 그 다음 fallback
+    for rc in reprt_codes:
+        for y in candidate_years:
+            first_tries.append((y, rc))
+
+    # 중복 제거(순서 유지)
+    seen = set()
+    tries = []
+    for y, rc in first_tries:
+        if (y, rc) not in seen:
+            seen.add((y, rc))
+            tries.append((y, rc))
+
+    available: frozenset[tuple[int, str]] | None = None
+    for i, (y, rc) in enumerate(tries):
+        # 첫 후보 실패 이후에는 제출 보고서 목록으로 거름(재무 조회에서 이미 조회했으면 캐시 재사용)
+        if i and available is None:
+            available = dart_available_reports(api_key, corp_code, min(candidate_years))
+        if available is not None and (y, rc) not in available:
+            continue
+        try:
+            df = dart_stock_total_status(api_key, corp_code, y, rc)
+            issued, treasury, float_sh = pick_issued_shares(df)
+            if issued is not None:
+                flags["year_used"] = y
+                flags["report_code_used"] = rc
+                found = True
+                break
+        except Exception as e:
+            flags["LAST_ERR"] = f"{type(e).__name__}: {e}"
+            flags["LAST_TRY"] = {"year": y, "reprt_code": rc}
+
+    if not found:
+        return {"shares_out": None, "treasury_shares": None, "float_shares": None,
+                "data_quality": {"FLAG_NO_SHARES": True, **flags}}
+
+    return {"shares_out": issued, "treasury_shares": treasury, "float_shares": float_sh,
+            "data_quality": flags}
+
+
 def fetch_shares_out_for_tickers(
     api_key: str,
     tickers: list[str],
@@ -377,67 +728,16 @@ def fetch_shares_out_for_tickers(
     """
     ticker -> {shares_out, treasury_shares, float_shares, data_quality}
     """
-    from datetime import date as _date
-    current_year = _date.today().year
-
-    reprt_codes = ["11011", "11014", "11012", "11013"]
-    candidate_years = [current_year - 2, current_year - 3, current_year - 1]
+    reprt_codes = list(REPRT_CODES)
+    candidate_years = candidate_fs_years()
 
+    code_map = build_corp_code_map(corp_df)
     out: dict[str, dict] = {}
 
     for tk in tickers:
         tk = str(tk).strip().zfill(6)
         name = ticker_to_name.get(tk) if ticker_to_name else None
-
-        corp_code = resolve_corp_code(corp_df, tk, name)
-        if not corp_code:
-            out[tk] = {"shares_out": None, "treasury_shares": None, "float_shares": None,
-                       "data_quality": {"FLAG_NO_CORP_CODE": True, "name": name}}
-            continue
-
-        flags = {"name": name}
-        found = False
-        issued = treasury = float_sh = None
-
-        # fundamentals에서 성공한 year/report가 있으면 그 조합부터 시도
-        first_tries = []
-        if preferred_year_report and tk in preferred_year_report:
-            y0, rc0 = preferred_year_report[tk]
-            first_tries.append((y0, rc0))
-
-        # 그 다음 fallback
-        for rc in reprt_codes:
-            for y in candidate_years:
-                first_tries.append((y, rc))
-
-        # 중복 제거(순서 유지)
-        seen = set()
-        tries = []
-        for y, rc in first_tries:
-            if (y, rc) not in seen:
-                seen.add((y, rc))
-                tries.append((y, rc))
-
-        for y, rc in tries:
-            try:
-                df = dart_stock_total_status(api_key, corp_code, y, rc)
-                issued, treasury, float_sh = pick_issued_shares(df)
-                if issued is not None:
-                    flags["year_used"] = y
-                    flags["report_code_used"] = rc
-                    found = True
-                    break
-            except Exception as e:
-                flags["LAST_ERR"] = f"{type(e).__name__}: {e}"
-                flags["LAST_TRY"] = {"year": y, "reprt_code": rc}
-                time.sleep(0.2)
-
-        if not found:
-            out[tk] = {"shares_out": None, "treasury_shares": None, "float_shares": None,
-                       "data_quality": {"FLAG_NO_SHARES": True, **flags}}
-            continue
-
-        out[tk] = {"shares_out": issued, "treasury_shares": treasury, "float_shares": float_sh,
-                   "data_quality": flags}
+        preferred = preferred_year_report.get(tk) if preferred_year_report else None
+        out[tk] = _fetch_shares_one(api_key, tk, code_map, name, preferred, reprt_codes, candidate_years)
 
     return out
@@ -1,15 +1,58 @@
 from __future__ import annotations
 
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+
 import pandas as pd
 import FinanceDataReader as fdr
 
 
+# 거래일 조회 결과 디스크 캐시: {"YYYY-MM-DD|lookback": "YYYY-MM-DD"}
+TRADING_DAY_CACHE_PATH = Path("data/.trading_days.json")
+
+
+def _load_trading_day_cache() -> dict[str, str]:
+    try:
+        return json.loads(TRADING_DAY_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_trading_day_cache(cache: dict[str, str]) -> None:
+    # 임시 파일에 쓰고 교체(atomic) → 중간에 끊겨도 깨진 JSON이 남지 않음
+    TRADING_DAY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TRADING_DAY_CACHE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, TRADING_DAY_CACHE_PATH)
+
+
+@lru_cache(maxsize=64)
 def resolve_recent_business_day(d: date, lookback_days: int = 14) -> date:
     """
     FDR은 거래일이 아니면 데이터가 비거나 에러가 날 수 있으므로,
     d부터 과거로 lookback_days 범위에서 '데이터가 존재하는' 가장 최근 날짜를 찾는다.
+
+    SW 관점:
+    - 프로세스 내: lru_cache, 재실행 간: data/.trading_days.json 캐시 → 후보일마다 DataReader 호출 생략
+    - 오늘(d >= today)은 장중/장 마감 전 결과가 바뀔 수 있으므로 디스크에는 과거 날짜만 저장
     """
+    key = f"{d.isoformat()}|{lookback_days}"
+    cache = _load_trading_day_cache()
+    if key in cache:
+        return date.fromisoformat(cache[key])
+
+    resolved = _probe_recent_business_day(d, lookback_days)
+    if d < date.today():
+        cache[key] = resolved.isoformat()
+        _save_trading_day_cache(cache)
+    return resolved
+
+
+def _probe_recent_business_day(d: date, lookback_days: int) -> date:
     # 삼성전자(005930)를 기준으로 거래일 여부를 판단(가장 안정적)
     test_code = "005930"
     for i in range(lookback_days + 1):
@@ -25,13 +68,28 @@ def resolve_recent_business_day(d: date, lookback_days: int = 14) -> date:
     raise RuntimeError(f"Could not find a business day within {lookback_days} days from {d}")
 
 
-def fetch_kospi_universe(as_of: date) -> pd.DataFrame:
+# 종가 개별 조회 동시 스레드 수(네트워크 I/O 대기 위주)
+CLOSE_FETCH_WORKERS = 24
+
+
+def _fetch_close_one(tk: str, t: str) -> float | None:
+    """ticker의 t(YYYY-MM-DD) 종가. 데이터 없음/에러는 None"""
+    try:
+        px = fdr.DataReader(tk, t, t)
+        if px is not None and len(px) > 0 and "Close" in px.columns:
+            return float(px["Close"].iloc[-1])
+        return None
+    except Exception:
+        return None
+
+
+def fetch_kospi_universe(as_of: date, *, max_workers: int = CLOSE_FETCH_WORKERS) -> pd.DataFrame:
     """
     FDR 기반 코스피 전체 종목 시장데이터:
       - ticker, name, market, close_price, market_cap(NULL), shares_out(NULL), as_of
     주의:
       - FDR listing에서 KOSPI 종목을 가져옴
-      - 종가(close)는 각 티커별 DataReader로 조회 (시간이 조금 걸릴 수 있음)
+      - 종가(close)는 각 티커별 DataReader로 조회 (max_workers 스레드로 병렬)
       - 시총/주식수는 1차에서는 NULL로 둠 (pykrx가 복구되면 다시 채우거나 다른 소스 추가)
     """
     trading_day = resolve_recent_business_day(as_of, lookback_days=40)
@@ -49,19 +107,11 @@ def fetch_kospi_universe(as_of: date) -> pd.DataFrame:
     df["ticker"] = df["ticker"].astype(str).str.zfill(6)
     df["market"] = "KOSPI"
 
-    # 2) 종가(해당일 종가). 많은 종목을 개별 호출하면 느릴 수 있으니,
-    #    우선 MVP로는 "Close만" 채우고 나중에 최적화(캐시/병렬)를 붙임.
+    # 2) 종가(해당일 종가). MVP로는 "Close만" 채움
+    # SW 관점: 티커별 DataReader는 blocking HTTP → 스레드 풀로 동시 조회(ex.map은 입력 순서 유지)
     t = trading_day.strftime("%Y-%m-%d")
-    closes = []
-    for tk in df["ticker"].tolist():
-        try:
-            px = fdr.DataReader(tk, t, t)
-            if px is not None and len(px) > 0 and "Close" in px.columns:
-                closes.append(float(px["Close"].iloc[-1]))
-            else:
-                closes.append(None)
-        except Exception:
-            closes.append(None)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        closes = list(ex.map(lambda tk: _fetch_close_one(tk, t), df["ticker"].tolist()))
 
     df["close_price"] = closes
     df["market_cap"] = None
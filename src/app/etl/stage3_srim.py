@@ -2,15 +2,53 @@
 
 from __future__ import annotations
 
-import json
+from types import MappingProxyType
 from typing import Dict, Any, List
 
+import numpy as np
+import orjson
 import pandas as pd
+from psycopg2.extras import Json, execute_values
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.models import SrimInput, compute_srim
-from app.utils.json_sanitize import sanitize_for_json, safe_float_or_none
+from app.etl.load import PG_BATCH_PAGE_SIZE, _copy_upsert
+from app.models import compute_srim_arrays
+from app.utils.json_sanitize import safe_float_or_none
+
+# SW 관점: 이 행 수 이상이면 multi-row VALUES 대신 COPY → 스테이징 → INSERT ... SELECT 경로로 업서트
+SRIM_COPY_MIN_ROWS = 1024
+
+_SRIM_RESULT_COLS = ["snapshot_id", "ticker", "bps", "roe", "r", "fair_price", "gap_pct", "flags"]
+
+# S-RIM 의미: ROE 산출 방식 메타(모든 행 공통) - 행마다 새로 만들지 않고 읽기 전용 상수 재사용
+_CONST_FLAGS = MappingProxyType({
+    "roe_method": "NI_PARENT / EQUITY_PARENT",
+    "roe_is_annualized": False,
+    "equity_is_average": False,
+})
+
+
+def _finite_or_none(a: np.ndarray) -> List[float | None]:
+    """float64 배열 → Python float 리스트(NaN/Inf는 None), safe_float_or_none의 배열 버전"""
+    out = a.astype(object)  # SW 관점: object 변환 시 원소가 Python float(psycopg2 바인딩 그대로 가능)
+    out[~np.isfinite(a)] = None
+    return out.tolist()
+
+
+def _dumps_flags(flags: Dict[str, Any]) -> str:
+    """flags dict → JSON 텍스트(orjson: NaN/Inf -> null, numpy 스칼라 허용)"""
+    return orjson.dumps(flags, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+# SW 관점: 요구수익률 조회 SQL(단건) - text()를 모듈에서 한 번만 만들어 재사용(load_calc_ready_rows의 스칼라 서브쿼리와 동일 규칙)
+_DISCOUNT_RATE_SQL_BODY = """
+    select rate
+    from discount_rate_snapshot
+    where snapshot_id = :sid
+    order by as_of_date desc nulls last   -- SW 관점: as_of_date가 있으면 가장 최신값 사용
+    limit 1
+"""
+_DISCOUNT_RATE_SQL = text(_DISCOUNT_RATE_SQL_BODY)
 
 
 def load_discount_rate(db: Session, snapshot_id: str, default_rate: float) -> float:
@@ -20,16 +58,7 @@ def load_discount_rate(db: Session, snapshot_id: str, default_rate: float) -> fl
     S-RIM 의미: r은 ROE와 비교되는 기준선이자, 초과이익 현재가치 계산의 분모
     SW 관점: discount_rate_snapshot 스키마 변화에 안전하게 동작하도록 단건 조회 + fallback
     """
-    row = db.execute(
-        text("""
-            select rate
-            from discount_rate_snapshot
-            where snapshot_id = :sid
-            order by as_of_date desc nulls last   -- SW 관점: as_of_date가 있으면 가장 최신값 사용
-            limit 1
-        """),
-        {"sid": snapshot_id},
-    ).fetchone()
+    row = db.execute(_DISCOUNT_RATE_SQL, {"sid": snapshot_id}).fetchone()
 
     if row and row[0] is not None:
         return float(row[0])  # SW 관점: DB에 값이 있으면 그것을 신뢰
@@ -43,17 +72,21 @@ def load_calc_ready_rows(db: Session, snapshot_id: str) -> pd.DataFrame:
 
     S-RIM 의미: fair_price 계산에 필요한 (equity, net_income, shares_out, close_price)를 확보
     SW 관점: DB에서 calc_ready를 확정해 Python 계산 과정의 예외를 최소화
+    - r 컬럼: discount_rate_snapshot의 요구수익률(없으면 NaN) → 별도 조회 왕복 없이 함께 로드
     """
-    rows = db.execute(
+    # SW 관점: numeric 컬럼은 SQL에서 float8로 cast → psycopg2가 Decimal 대신 float로 바로 변환
+    # - 셀마다 Decimal 객체 생성 + 이후 float 변환 없이 read_sql이 float64 컬럼으로 구성
+    df = pd.read_sql(
         text("""
             select
-                m.snapshot_id,                  -- SW 관점: 스냅샷 키
-                m.ticker,                       -- SW 관점: 종목 키
-                t.name as name,                 -- SW 관점: 종목명은 tickers에서 조회
-                m.close_price as market_price,  -- S-RIM 의미: 시장가격(종가) = 괴리율 계산에 필요
-                m.shares_out,                   -- S-RIM 의미: 발행주식수 = 주당 환산 분모
-                f.equity_parent,                -- S-RIM 의미: 지배주주지분 = BPS 분자
-                f.net_income_parent             -- S-RIM 의미: 지배주주순이익 = ROE 산출
+                m.snapshot_id,                                   -- SW 관점: 스냅샷 키
+                m.ticker,                                        -- SW 관점: 종목 키
+                t.name as name,                                  -- SW 관점: 종목명은 tickers에서 조회
+                m.close_price::float8 as market_price,           -- S-RIM 의미: 시장가격(종가) = 괴리율 계산에 필요
+                m.shares_out::float8 as shares_out,              -- S-RIM 의미: 발행주식수 = 주당 환산 분모
+                f.equity_parent::float8 as equity_parent,        -- S-RIM 의미: 지배주주지분 = BPS 분자
+                f.net_income_parent::float8 as net_income_parent, -- S-RIM 의미: 지배주주순이익 = ROE 산출
+                (""" + _DISCOUNT_RATE_SQL_BODY + """)::float8 as r     -- S-RIM 의미: 요구수익률(스칼라 서브쿼리, 한 번만 평가)
             from market_snapshot m
             join fundamental_snapshot f
               on f.snapshot_id = m.snapshot_id  -- SW 관점: 동일 스냅샷에서만 결합
@@ -66,13 +99,18 @@ def load_calc_ready_rows(db: Session, snapshot_id: str) -> pd.DataFrame:
               and f.equity_parent is not null
               and f.net_income_parent is not null
         """),
-        {"sid": snapshot_id},
-    ).fetchall()
-
-    df = pd.DataFrame(
-        rows,
-        columns=["snapshot_id", "ticker", "name", "market_price", "shares_out", "equity_parent", "net_income_parent"],
+        db.connection(),
+        params={"sid": snapshot_id},
+        dtype={
+            "market_price": "float64",
+            "shares_out": "float64",
+            "equity_parent": "float64",
+            "net_income_parent": "float64",
+            "r": "float64",
+        },
     )
+    # SW 관점: ticker를 항상 6자리 문자열로 정규화(조인/PK 일관성) - 행 루프 대신 str accessor로 컬럼 단위 한 번
+    df["ticker"] = df["ticker"].astype(str).str.strip().str.zfill(6)
     return df
 
 
@@ -84,13 +122,30 @@ def upsert_srim_result(db: Session, snapshot_id: str, rows: List[Dict[str, Any]]
       snapshot_id, ticker (PK)
       bps, roe, r, fair_price, gap_pct, flags(jsonb), computed_at(default now())
 
-    SW 관점: 동일 snapshot_id+ticker는 항상 최신 계산값으로 덮어씀
+    rows: 컬럼명 dict 목록, flags는 dict 그대로(직렬화는 저장 경로에서 한 번만)
+
+    SW 관점: 동일 snapshot_id+ticker는 항상 최신 계산값으로 덮어씀(commit은 호출 측 run_stage3_srim이 한 번)
     S-RIM 의미: 스냅샷별 이론가(fair_price)와 주요 지표(ROE, BPS, r)를 기록
     """
     if not rows:
         return 0
 
-    stmt = text("""
+    if len(rows) >= SRIM_COPY_MIN_ROWS:
+        # SW 관점: 대량이면 CSV 스트림 한 번(COPY)으로 적재 → 파라미터 바인딩/VALUES 파싱 비용 제거
+        # - flags는 여기서 한 번만 JSON 텍스트로 만들고, COPY 시 스테이징 테이블의 jsonb 컬럼으로 바로 파싱됨
+        df = pd.DataFrame.from_records(rows, columns=_SRIM_RESULT_COLS)
+        df["flags"] = [_dumps_flags(f) for f in df["flags"].tolist()]
+        _copy_upsert(
+            db,
+            "srim_result",
+            df,
+            _SRIM_RESULT_COLS,
+            ["snapshot_id", "ticker"],
+            extra_updates={"computed_at": "now()"},  # SW 관점: 재계산 시각 갱신
+        )
+        return len(rows)
+
+    sql = """
         insert into srim_result (
             snapshot_id,
             ticker,
@@ -100,16 +155,7 @@ def upsert_srim_result(db: Session, snapshot_id: str, rows: List[Dict[str, Any]]
             fair_price,
             gap_pct,
             flags
-        ) values (
-            :snapshot_id,
-            :ticker,
-            :bps,
-            :roe,
-            :r,
-            :fair_price,
-            :gap_pct,
-            cast(:flags as jsonb)
-        )
+        ) values %s
         on conflict (snapshot_id, ticker)
         do update set
             bps        = excluded.bps,
@@ -119,15 +165,158 @@ def upsert_srim_result(db: Session, snapshot_id: str, rows: List[Dict[str, Any]]
             gap_pct    = excluded.gap_pct,
             flags      = excluded.flags,
             computed_at = now()  -- SW 관점: 재계산 시각 갱신
-    """)
+    """
+    # SW 관점: flags는 psycopg2 Json 어댑터(orjson 직렬화)로 바인딩 → INSERT 대상 컬럼 타입(jsonb)으로 바로 해석, cast 불필요
+    values = (
+        (row["snapshot_id"], row["ticker"], row["bps"], row["roe"], row["r"],
+         row["fair_price"], row["gap_pct"], Json(row["flags"], dumps=_dumps_flags))
+        for row in rows
+    )
 
-    count = 0
-    for r in rows:
-        db.execute(stmt, r)  # SW 관점: 월 1회 배치이므로 row 단위 실행도 충분히 단순/안전
-        count += 1
+    # SW 관점: 행마다 INSERT 왕복 대신 execute_values로 page_size 행씩 multi-row VALUES 전송(load.py 업서트와 동일 경로)
+    cur = db.connection().connection.cursor()
+    try:
+        execute_values(cur, sql, values, page_size=PG_BATCH_PAGE_SIZE)
+    finally:
+        cur.close()
+    return len(rows)
+
+
+def _sql_num(expr: str) -> str:
+    """float8 식 → numeric(NaN/±Inf는 NULL). float8 → text(최단 표현) → numeric으로 Python float 바인딩과 같은 값"""
+    return f"case when ({expr}) in ('NaN', 'Infinity', '-Infinity') then null else ({expr})::text::numeric end"
+
+
+def _sql_json_num(expr: str) -> str:
+    """float8 식 → jsonb number(NaN/±Inf는 null, orjson 직렬화와 동일)"""
+    return f"coalesce(to_jsonb({_sql_num(expr)}), 'null'::jsonb)"
+
+
+# SW 관점: compute_srim_arrays(_srim_kernel_numpy)와 같은 수식/판정 순서를 float8로 DB 안에서 계산
+# - 입력 로드(load_calc_ready_rows) → Python 계산 → 업서트 왕복 없이 INSERT ... SELECT 한 문장
+# - invalid: 0 정상, 1 결측(NaN/r 없음), 2 자본<=0, 3 주식수<=0, 4 r<=0 (_unpack_flags 우선순위와 동일)
+# - flags 키 구성도 run_stage3_srim의 Python 경로와 동일(jsonb라 키 순서는 무관)
+_SRIM_SQL = text(f"""
+    with calc as (
+        select
+            m.snapshot_id,
+            m.ticker,
+            m.close_price::float8       as price,
+            m.shares_out::float8        as s,
+            f.equity_parent::float8     as e,
+            f.net_income_parent::float8 as ni,
+            cast(:r as float8)          as r
+        from market_snapshot m
+        join fundamental_snapshot f
+          on f.snapshot_id = m.snapshot_id
+         and f.ticker = m.ticker
+        where m.snapshot_id = :sid
+          and m.close_price is not null
+          and m.shares_out is not null
+          and f.equity_parent is not null
+          and f.net_income_parent is not null
+    ), k as (
+        select
+            calc.*,
+            case
+                when e = 'NaN' or ni = 'NaN' or s = 'NaN' or r is null or r = 'NaN' then 1
+                when e <= 0 then 2
+                when s <= 0 then 3
+                when r <= 0 then 4
+                else 0
+            end as invalid,
+            (price > 0 and price <> 'NaN') as price_ok
+        from calc
+    ), v as (
+        select
+            k.*,
+            case when invalid = 0 then e / s end                    as bps,
+            case when invalid = 0 then ni / e end                   as roe,
+            case when invalid = 0 then ni / e - r end               as spread,
+            case when invalid = 0 then (ni / e - r) * e end         as resid_raw,
+            case when invalid = 0 then :clamp and (ni / e - r) * e < 0 else false end as clamped
+        from k
+    ), w as (
+        select
+            v.*,
+            case when invalid = 0
+                 then ((case when clamped then 0.0::float8 else resid_raw end) / r) * cast(:persistence as float8)
+            end as pv
+        from v
+    ), x as (
+        select
+            w.*,
+            (e + pv) / s as fair
+        from w
+    )
+    insert into srim_result (snapshot_id, ticker, bps, roe, r, fair_price, gap_pct, flags)
+    select
+        snapshot_id,
+        ticker,
+        {_sql_num("bps")},
+        {_sql_num("roe")},
+        {_sql_num("r")},
+        {_sql_num("fair")},
+        case when price_ok then {_sql_num("(fair / price - 1.0) * 100.0")} end,
+        jsonb_build_object(
+            'market_price_used', {_sql_json_num("price")},
+            'persistence_used', {_sql_json_num("cast(:persistence as float8)")},
+            'roe_method', 'NI_PARENT / EQUITY_PARENT',
+            'roe_is_annualized', false,
+            'equity_is_average', false
+        )
+        || case invalid
+               when 1 then '{{"FLAG_MISSING_INPUT": true}}'::jsonb
+               when 2 then '{{"FLAG_EQUITY_NON_POSITIVE": true}}'::jsonb
+               when 3 then '{{"FLAG_SHARES_NON_POSITIVE": true}}'::jsonb
+               when 4 then '{{"FLAG_DISCOUNT_RATE_NON_POSITIVE": true}}'::jsonb
+               else jsonb_build_object(
+                        'residual_income_total', {_sql_json_num("resid_raw")},
+                        'pv_residual_total', {_sql_json_num("pv")}
+                    )
+                    || case when clamped then '{{"FLAG_NEGATIVE_RESIDUAL_CLAMPED": true}}'::jsonb else '{{}}'::jsonb end
+                    || case when not price_ok then '{{"FLAG_BAD_MARKET_PRICE": true}}'::jsonb else '{{}}'::jsonb end
+                    || case when roe < 0 then '{{"FLAG_ROE_NEGATIVE": true}}'::jsonb else '{{}}'::jsonb end
+                    || case when spread < 0 then '{{"FLAG_ROE_BELOW_R": true}}'::jsonb else '{{}}'::jsonb end
+           end
+        || case when {_sql_num("bps")} is null or {_sql_num("roe")} is null
+                then '{{"FLAG_SUSPICIOUS_NUMERIC": true}}'::jsonb else '{{}}'::jsonb end
+    from x
+    on conflict (snapshot_id, ticker)
+    do update set
+        bps        = excluded.bps,
+        roe        = excluded.roe,
+        r          = excluded.r,
+        fair_price = excluded.fair_price,
+        gap_pct    = excluded.gap_pct,
+        flags      = excluded.flags,
+        computed_at = now()  -- SW 관점: 재계산 시각 갱신
+""")
+
+
+def run_srim_sql(
+    db: Session,
+    snapshot_id: str,
+    r: float | None,
+    *,
+    persistence: float = 1.0,
+    clamp_negative_residual: bool = True,
+) -> int:
+    """
+    S-RIM 계산 + srim_result 업서트를 DB 한 문장으로 실행(engine="sql")
 
-    db.commit()  # SW 관점: 트랜잭션 커밋으로 결과 영속화
-    return count
+    SW 관점: Python/pandas 경유 없이 조인한 행을 바로 계산해 저장(왕복 1회), 반환은 업서트 row 수(commit은 호출 측)
+    """
+    res = db.execute(
+        _SRIM_SQL,
+        {
+            "sid": snapshot_id,
+            "r": r,
+            "persistence": float(persistence),
+            "clamp": bool(clamp_negative_residual),
+        },
+    )
+    return int(res.rowcount or 0)
 
 
 def run_stage3_srim(
@@ -137,69 +326,115 @@ def run_stage3_srim(
     default_discount_rate: float,
     persistence: float = 1.0,
     clamp_negative_residual: bool = True,
+    engine: str = "python",
 ) -> Dict[str, Any]:
     """
     Stage3: S-RIM 계산 실행
 
     SW 관점: (read join) → (compute) → (upsert)
     S-RIM 의미: 종목별 fair_price(이론가)와 gap(괴리율)을 산출하여 서비스의 핵심 결과를 생성
+    engine: "python"(기본, compute_srim_arrays) | "sql"(DB 안에서 INSERT ... SELECT 한 문장으로 계산/저장)
     """
-    r = load_discount_rate(db, snapshot_id, default_discount_rate)  # S-RIM 의미: 이번 스냅샷의 요구수익률 확정
-    df = load_calc_ready_rows(db, snapshot_id)  # SW 관점: 계산 가능한 row만 확보
+    # SW 관점: 조회 → 계산 → 업서트를 한 트랜잭션으로(BEGIN/COMMIT 한 쌍), ORM autoflush는 끔(Core/DBAPI 경로만 사용)
+    with db.no_autoflush:
+        summary = _run_stage3(
+            db,
+            snapshot_id,
+            default_discount_rate=default_discount_rate,
+            persistence=persistence,
+            clamp_negative_residual=clamp_negative_residual,
+            engine=engine,
+        )
+    db.commit()  # SW 관점: 트랜잭션 커밋으로 결과 영속화(stage 단위 한 번)
+    return summary
 
-    out_rows: List[Dict[str, Any]] = []
 
-    for _, row in df.iterrows():
-        # SW 관점: ticker를 항상 6자리 문자열로 정규화(조인/PK 일관성)
-        ticker = str(row["ticker"]).strip().zfill(6)
-
-        # S-RIM 계산 입력 구성
-        x = SrimInput(
-            ticker=ticker,                                 # SW 관점: 종목 식별자
-            equity_parent=float(row["equity_parent"]),      # S-RIM 의미: 자기자본(지배주주지분)
-            net_income_parent=float(row["net_income_parent"]),  # S-RIM 의미: 순이익(지배주주순이익)
-            shares_out=float(row["shares_out"]),            # S-RIM 의미: 발행주식수
-            market_price=float(row["market_price"]),        # S-RIM 의미: 시장가격(종가)
-            discount_rate=float(r),                         # S-RIM 의미: 요구수익률 r
+def _run_stage3(
+    db: Session,
+    snapshot_id: str,
+    *,
+    default_discount_rate: float,
+    persistence: float,
+    clamp_negative_residual: bool,
+    engine: str,
+) -> Dict[str, Any]:
+    """run_stage3_srim 본문(commit 없음): r 확정 → 계산 → srim_result 업서트"""
+    if engine == "sql":
+        r = load_discount_rate(db, snapshot_id, default_discount_rate)  # S-RIM 의미: 이번 스냅샷의 요구수익률 확정
+        upserted = run_srim_sql(
+            db, snapshot_id, r, persistence=persistence, clamp_negative_residual=clamp_negative_residual
         )
+        return {
+            "snapshot_id": snapshot_id,
+            "discount_rate": r,
+            "calc_rows": upserted,      # SW 관점: SQL 경로는 계산 대상 = 업서트 대상(한 문장)
+            "upserted_rows": upserted,
+        }
+    if engine != "python":
+        raise ValueError(f"unknown stage3 engine: {engine!r}")
 
-        # S-RIM 계산 실행
-        y = compute_srim(
-            x,
-            persistence=persistence,                         # S-RIM 의미: 초과이익 지속 가정(기본 1.0)
-            clamp_negative_residual=clamp_negative_residual, # S-RIM 의미: ROE<r일 때 보수적 처리(기본 True)
-        )
+    df = load_calc_ready_rows(db, snapshot_id)  # SW 관점: 계산 가능한 row만 확보
+
+    # S-RIM 의미: 이번 스냅샷의 요구수익률 확정(DB 값 우선, 없으면 default)
+    # SW 관점: r은 계산 대상 조회에 함께 실려 옴 → 대상 행이 없을 때만 단건 조회
+    if len(df):
+        rate = df["r"].iat[0]
+        r = float(rate) if not np.isnan(rate) else float(default_discount_rate)
+    else:
+        r = load_discount_rate(db, snapshot_id, default_discount_rate)
+
+    tickers = df["ticker"].tolist()  # SW 관점: load_calc_ready_rows에서 이미 6자리 문자열로 정규화됨
+    market_price = df["market_price"].to_numpy(dtype=np.float64)  # S-RIM 의미: 시장가격(종가)
+
+    # S-RIM 계산 실행(벡터화: 스냅샷 전체 종목을 한 번에 계산)
+    y = compute_srim_arrays(
+        equity_parent=df["equity_parent"].to_numpy(dtype=np.float64),          # S-RIM 의미: 자기자본(지배주주지분)
+        net_income_parent=df["net_income_parent"].to_numpy(dtype=np.float64),  # S-RIM 의미: 순이익(지배주주순이익)
+        shares_out=df["shares_out"].to_numpy(dtype=np.float64),                # S-RIM 의미: 발행주식수
+        market_price=market_price,
+        discount_rate=float(r),                          # S-RIM 의미: 요구수익률 r
+        persistence=persistence,                         # S-RIM 의미: 초과이익 지속 가정(기본 1.0)
+        clamp_negative_residual=clamp_negative_residual, # S-RIM 의미: ROE<r일 때 보수적 처리(기본 True)
+    )
 
+    out_rows: List[Dict[str, Any]] = []
+    r_value = safe_float_or_none(r)  # SW 관점: 스냅샷 상수 → 행마다 변환하지 않음
+
+    # SW 관점: numeric 컬럼에는 NaN을 넣을 수 없으니 NULL로 저장 - 배열 단위 isfinite 한 번으로 None 치환
+    for ticker, price, row_flags, bps, roe, fair, gap in zip(
+        tickers,
+        market_price.tolist(),
+        y["flags"],
+        _finite_or_none(y["bps"]),
+        _finite_or_none(y["roe"]),
+        _finite_or_none(y["srim_price"]),
+        _finite_or_none(y["gap_pct"]),
+    ):
         # SW 관점: srim_result 스키마에 맞춘 flags 구성(flags는 JSONB에 저장되므로 NaN/Inf를 반드시 제거해야 함)
-        flags: Dict[str, Any] = dict(y.flags)
-        flags["market_price_used"] = x.market_price
+        # - NaN/Inf float는 orjson 직렬화 시 null로 기록되므로 별도 sanitize 패스 없음
+        # - row_flags는 _unpack_flags가 행마다 새로 만든 dict → 복사/update용 임시 dict 없이 그대로 채움
+        flags: Dict[str, Any] = row_flags
+        flags["market_price_used"] = price
         flags["persistence_used"] = persistence
 
-        flags = sanitize_for_json(flags)  # SW 관점: NaN/Inf -> None으로 치환
-
-        if safe_float_or_none(y.bps) is None or safe_float_or_none(y.roe) is None:
+        if bps is None or roe is None:
             flags["FLAG_SUSPICIOUS_NUMERIC"] = True  # SW 관점: UI에서 경고/필터링에 사용
 
-        flags.update({
-            "roe_method": "NI_PARENT / EQUITY_PARENT",
-            "roe_is_annualized": False,
-            "equity_is_average": False,
-        })
+        flags.update(_CONST_FLAGS)  # SW 관점: 실행 내내 동일한 메타 키는 모듈 상수로 한 번에 병합
 
         out_rows.append(
             {
                 "snapshot_id": snapshot_id,
                 "ticker": ticker,
 
-                # SW 관점: numeric 컬럼에는 NaN을 넣을 수 없으니 NULL로 저장
-                "bps": safe_float_or_none(y.bps),
-                "roe": safe_float_or_none(y.roe),
-                "r": safe_float_or_none(r),
-                "fair_price": safe_float_or_none(y.srim_price),
-                "gap_pct": safe_float_or_none(y.gap_pct),
+                "bps": bps,
+                "roe": roe,
+                "r": r_value,
+                "fair_price": fair,
+                "gap_pct": gap,
 
-                # SW 관점: allow_nan=False로 “NaN 토큰 생성”을 원천 차단
-                "flags": json.dumps(flags, ensure_ascii=False, allow_nan=False),
+                # SW 관점: dict 그대로 넘기고 upsert_srim_result가 저장 경로에 맞게 한 번 직렬화(_dumps_flags)
+                "flags": flags,
             }
         )
 
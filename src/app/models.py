@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
+import numpy as np
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Date, Numeric, Boolean, Text, ForeignKey
+from sqlalchemy import String, Date, Numeric, Boolean, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
 from datetime import datetime, date
 
@@ -121,6 +122,261 @@ def compute_srim(
     )
 
 
+# --- flags 비트필드 (SW 관점: 핫루프 안에서는 dict 대신 uint8 비트만 기록, dict는 마지막에 한 번 풀어냄) ---
+_BIT_MISSING_INPUT = 1 << 0
+_BIT_EQUITY_NON_POSITIVE = 1 << 1
+_BIT_SHARES_NON_POSITIVE = 1 << 2
+_BIT_DISCOUNT_RATE_NON_POSITIVE = 1 << 3
+_BIT_NEGATIVE_RESIDUAL_CLAMPED = 1 << 4
+_BIT_BAD_MARKET_PRICE = 1 << 5
+_BIT_ROE_NEGATIVE = 1 << 6
+_BIT_ROE_BELOW_R = 1 << 7
+
+_INVALID_BITS = (
+    _BIT_MISSING_INPUT | _BIT_EQUITY_NON_POSITIVE | _BIT_SHARES_NON_POSITIVE | _BIT_DISCOUNT_RATE_NON_POSITIVE
+)
+
+
+def _srim_kernel_numpy(eq, ni, shares, price, r, persistence, clamp, out):
+    """NumPy 경로: 배열 연산으로 out(bps/roe/spread/residual/pv/fair/gap/bits)을 채움."""
+    n = len(eq)
+    bits = np.zeros(n, dtype=np.uint8)
+
+    # --- 입력값 검증 마스크 (compute_srim의 early-return 순서와 동일하게 배타적으로 구성) ---
+    missing = np.isnan(eq) | np.isnan(ni) | np.isnan(shares) | np.isnan(r)
+    eq_bad = ~missing & (eq <= 0)
+    shares_bad = ~missing & ~eq_bad & (shares <= 0)
+    r_bad = ~missing & ~eq_bad & ~shares_bad & (r <= 0)
+    valid = ~(missing | eq_bad | shares_bad | r_bad)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # --- 핵심 지표 계산 (S-RIM 의미: ROE, BPS, Spread는 모델의 뼈대) ---
+        bps = eq / shares
+        roe = ni / eq
+        spread = roe - r
+
+        # --- 초과이익(Residual Income) 현재가치 계산 ---
+        residual_raw = spread * eq
+        clamped = valid & (residual_raw < 0) if clamp else np.zeros(n, dtype=bool)
+        pv_residual = (np.where(clamped, 0.0, residual_raw) / r) * persistence
+        srim_price = (eq + pv_residual) / shares
+
+        # --- 시장가격 대비 괴리율 계산 ---
+        price_ok = price > 0  # SW 관점: NaN 비교는 False -> FLAG_BAD_MARKET_PRICE
+        gap_pct = (srim_price / price - 1.0) * 100.0
+
+    out["bps"][:] = np.where(valid, bps, np.nan)
+    out["roe"][:] = np.where(valid, roe, np.nan)
+    out["spread"][:] = np.where(valid, spread, np.nan)
+    out["residual_income_total"][:] = np.where(valid, residual_raw, np.nan)
+    out["pv_residual_total"][:] = np.where(valid, pv_residual, np.nan)
+    out["srim_price"][:] = np.where(valid, srim_price, np.nan)
+    out["gap_pct"][:] = np.where(valid & price_ok, gap_pct, np.nan)
+
+    bits[missing] |= _BIT_MISSING_INPUT
+    bits[eq_bad] |= _BIT_EQUITY_NON_POSITIVE
+    bits[shares_bad] |= _BIT_SHARES_NON_POSITIVE
+    bits[r_bad] |= _BIT_DISCOUNT_RATE_NON_POSITIVE
+    bits[clamped] |= _BIT_NEGATIVE_RESIDUAL_CLAMPED
+    bits[valid & ~price_ok] |= _BIT_BAD_MARKET_PRICE
+    bits[valid & (roe < 0)] |= _BIT_ROE_NEGATIVE
+    bits[valid & (spread < 0)] |= _BIT_ROE_BELOW_R
+    out["flag_bits"][:] = bits
+
+
+try:
+    import numba
+except ImportError:  # SW 관점: numba는 선택 의존성(없으면 NumPy 경로로 동일 결과)
+    numba = None
+
+if numba is not None:
+    # SW 관점: fastmath는 쓰지 않음(reassoc/contract/arcp는 연산 순서·FMA·역수 근사로 결과 비트가 달라짐)
+    # - 커널은 행별 사칙연산뿐이라 병렬화(prange)만으로 충분하고, NumPy 경로와 비트 단위로 같은 결과 유지
+    @numba.njit(parallel=True, cache=True)
+    def _srim_kernel_numba(eq, ni, shares, price, r, persistence, clamp,
+                           bps_out, roe_out, spread_out, residual_out, pv_out, fair_out, gap_out, flag_bits_out):
+        """numba 경로: 종목 축을 prange로 나눠 bps/roe/fair/gap을 한 루프에서 계산(임시 배열 없음)."""
+        nan = np.nan
+        for i in numba.prange(len(eq)):
+            bps_out[i] = nan
+            roe_out[i] = nan
+            spread_out[i] = nan
+            residual_out[i] = nan
+            pv_out[i] = nan
+            fair_out[i] = nan
+            gap_out[i] = nan
+
+            e, n_i, s = eq[i], ni[i], shares[i]
+            if np.isnan(e) or np.isnan(n_i) or np.isnan(s) or np.isnan(r):
+                flag_bits_out[i] = _BIT_MISSING_INPUT
+                continue
+            if e <= 0:
+                flag_bits_out[i] = _BIT_EQUITY_NON_POSITIVE
+                continue
+            if s <= 0:
+                flag_bits_out[i] = _BIT_SHARES_NON_POSITIVE
+                continue
+            if r <= 0:
+                flag_bits_out[i] = _BIT_DISCOUNT_RATE_NON_POSITIVE
+                continue
+
+            b = 0
+            roe = n_i / e
+            spread = roe - r
+            residual = spread * e
+            residual_out[i] = residual
+            if clamp and residual < 0:
+                b |= _BIT_NEGATIVE_RESIDUAL_CLAMPED
+                residual = 0.0
+            pv = (residual / r) * persistence
+            fair = (e + pv) / s
+
+            p = price[i]
+            if p > 0:
+                gap_out[i] = (fair / p - 1.0) * 100.0
+            else:
+                b |= _BIT_BAD_MARKET_PRICE
+            if roe < 0:
+                b |= _BIT_ROE_NEGATIVE
+            if spread < 0:
+                b |= _BIT_ROE_BELOW_R
+
+            bps_out[i] = e / s
+            roe_out[i] = roe
+            spread_out[i] = spread
+            pv_out[i] = pv
+            fair_out[i] = fair
+            flag_bits_out[i] = b
+else:
+    _srim_kernel_numba = None
+
+
+def _run_srim_kernel(eq, ni, shares, price, r, persistence, clamp) -> Dict[str, np.ndarray]:
+    """결과 버퍼를 한 번 할당해 커널(numba 있으면 numba, 없으면 NumPy)에 넘김."""
+    n = len(eq)
+    out = {
+        k: np.empty(n, dtype=np.float64)
+        for k in ("bps", "roe", "spread", "residual_income_total", "pv_residual_total", "srim_price", "gap_pct")
+    }
+    out["flag_bits"] = np.empty(n, dtype=np.uint8)
+
+    if _srim_kernel_numba is not None:
+        _srim_kernel_numba(
+            eq, ni, shares, price, r, persistence, clamp,
+            out["bps"], out["roe"], out["spread"], out["residual_income_total"], out["pv_residual_total"],
+            out["srim_price"], out["gap_pct"], out["flag_bits"],
+        )
+    else:
+        _srim_kernel_numpy(eq, ni, shares, price, r, persistence, clamp, out)
+    return out
+
+
+def _unpack_flags(bits: int, residual_income_total: float, pv_residual_total: float) -> Dict[str, Any]:
+    """비트필드 -> compute_srim과 동일한 flags dict(키 순서 포함)."""
+    if bits & _INVALID_BITS:
+        if bits & _BIT_MISSING_INPUT:
+            return {"FLAG_MISSING_INPUT": True}
+        if bits & _BIT_EQUITY_NON_POSITIVE:
+            return {"FLAG_EQUITY_NON_POSITIVE": True}
+        if bits & _BIT_SHARES_NON_POSITIVE:
+            return {"FLAG_SHARES_NON_POSITIVE": True}
+        return {"FLAG_DISCOUNT_RATE_NON_POSITIVE": True}
+
+    f: Dict[str, Any] = {"residual_income_total": residual_income_total}
+    if bits & _BIT_NEGATIVE_RESIDUAL_CLAMPED:
+        f["FLAG_NEGATIVE_RESIDUAL_CLAMPED"] = True
+    f["pv_residual_total"] = pv_residual_total
+    if bits & _BIT_BAD_MARKET_PRICE:
+        f["FLAG_BAD_MARKET_PRICE"] = True
+    if bits & _BIT_ROE_NEGATIVE:
+        f["FLAG_ROE_NEGATIVE"] = True
+    if bits & _BIT_ROE_BELOW_R:
+        f["FLAG_ROE_BELOW_R"] = True
+    return f
+
+
+def compute_srim_arrays(
+    equity_parent: np.ndarray,
+    net_income_parent: np.ndarray,
+    shares_out: np.ndarray,
+    market_price: np.ndarray,
+    discount_rate: float,
+    *,
+    persistence: float = 1.0,
+    clamp_negative_residual: bool = True,
+) -> Dict[str, Any]:
+    """
+    compute_srim의 배치(벡터화) 버전: 종목 축(axis=0) 전체를 한 번에 계산
+
+    - 입력: 종목별 float64 배열(결측은 NaN), r은 스냅샷 단위 스칼라
+    - 반환: {"srim_price","bps","roe","spread","gap_pct": ndarray(계산 불능은 NaN), "flags": list[dict]}
+    - 행 단위 결과/flags는 compute_srim과 동일(키 순서 포함)
+
+    SW 관점: numba가 설치되어 있으면 병렬 JIT 커널, 없으면 NumPy 배열 연산으로 계산
+    """
+    eq = np.ascontiguousarray(equity_parent, dtype=np.float64)
+    ni = np.ascontiguousarray(net_income_parent, dtype=np.float64)
+    shares = np.ascontiguousarray(shares_out, dtype=np.float64)
+    price = np.ascontiguousarray(market_price, dtype=np.float64)
+    r = float(discount_rate) if discount_rate is not None else np.nan
+
+    out = _run_srim_kernel(eq, ni, shares, price, r, float(persistence), bool(clamp_negative_residual))
+
+    # --- flags 구성: 비트필드를 행별 dict로 한 번에 풀어냄 ---
+    flags: List[Dict[str, Any]] = [
+        _unpack_flags(b, ri, pv)
+        for b, ri, pv in zip(
+            out["flag_bits"].tolist(),
+            out["residual_income_total"].tolist(),
+            out["pv_residual_total"].tolist(),
+        )
+    ]
+
+    return {
+        "srim_price": out["srim_price"],
+        "bps": out["bps"],
+        "roe": out["roe"],
+        "spread": out["spread"],
+        "gap_pct": out["gap_pct"],
+        "flags": flags,
+    }
+
+
+def compute_srim_scenarios(
+    equity_parent: np.ndarray,
+    net_income_parent: np.ndarray,
+    shares_out: np.ndarray,
+    market_price: np.ndarray,
+    discount_rates: List[float],
+    *,
+    persistence: float = 1.0,
+    clamp_negative_residual: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    요구수익률 r 시나리오별 S-RIM 재계산(민감도 분석용)
+
+    - 반환: {"discount_rate": (k,), "srim_price"/"gap_pct": (k, n), "flag_bits": (k, n) uint8}
+    - flags dict는 만들지 않음(필요한 행만 _unpack_flags로 풀어서 사용)
+    """
+    eq = np.ascontiguousarray(equity_parent, dtype=np.float64)
+    ni = np.ascontiguousarray(net_income_parent, dtype=np.float64)
+    shares = np.ascontiguousarray(shares_out, dtype=np.float64)
+    price = np.ascontiguousarray(market_price, dtype=np.float64)
+    rates = np.asarray(discount_rates, dtype=np.float64)
+
+    srim_price = np.empty((len(rates), len(eq)), dtype=np.float64)
+    gap_pct = np.empty_like(srim_price)
+    flag_bits = np.empty(srim_price.shape, dtype=np.uint8)
+
+    for k, r in enumerate(rates.tolist()):
+        out = _run_srim_kernel(eq, ni, shares, price, r, float(persistence), bool(clamp_negative_residual))
+        srim_price[k] = out["srim_price"]
+        gap_pct[k] = out["gap_pct"]
+        flag_bits[k] = out["flag_bits"]
+
+    return {"discount_rate": rates, "srim_price": srim_price, "gap_pct": gap_pct, "flag_bits": flag_bits}
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -181,3 +437,31 @@ class SRimResult(Base):
 
     flags: Mapped[dict] = mapped_column(JSONB, default=dict)
     computed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.utcnow)
+
+
+# -----------------------------
+# 조회 경로용 인덱스 (운영 DB에는 CREATE INDEX CONCURRENTLY로 생성 권장)
+# -----------------------------
+# SW 관점: /srim/{snapshot_id} gap 정렬 + keyset 페이징, /snapshots/{sid}/srim 정렬 경로를 index-only scan으로
+# CREATE INDEX CONCURRENTLY ix_srim_snap_gap_ticker ON srim_result (snapshot_id, gap_pct DESC NULLS LAST, ticker DESC)
+#   INCLUDE (fair_price, roe, bps, flags);
+Index(
+    "ix_srim_snap_gap_ticker",
+    SRimResult.snapshot_id,
+    SRimResult.gap_pct.desc().nulls_last(),
+    SRimResult.ticker.desc(),
+    postgresql_include=["fair_price", "roe", "bps", "flags"],
+)
+
+# SW 관점: market_snapshot 조인은 PK(snapshot_id, ticker) 인덱스로 처리 — 같은 키의 보조 인덱스는 두지 않음
+# (stage1 COPY 업서트마다 동일 키 B-tree 2개를 유지하게 되므로). 이전에 만든 DB라면:
+# DROP INDEX CONCURRENTLY IF EXISTS ix_market_snap_pk;
+
+# SW 관점: only_kospi 필터(tickers.market = 'KOSPI')
+# CREATE INDEX CONCURRENTLY ix_tickers_market_ticker ON tickers (market, ticker);
+Index("ix_tickers_market_ticker", Ticker.market, Ticker.ticker)
+
+# SW 관점: flags 키 존재 검사(?, ?|) 용 GIN 인덱스
+# - jsonb_path_ops는 ?/?| 연산자를 지원하지 않으므로 기본 jsonb_ops 사용
+# CREATE INDEX CONCURRENTLY ix_srim_flags_gin ON srim_result USING gin (flags);
+Index("ix_srim_flags_gin", SRimResult.flags, postgresql_using="gin")
@@ -1,7 +1,13 @@
 import os
-import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import orjson
+import pandas as pd
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 
 # -----------------------------
 # 기본 설정
@@ -31,12 +37,7 @@ def compute_composite_score(it, weights, prefer_ok_only=True):
     weights: dict
     반환: (score, components_dict) 또는 (None, 이유)
     """
-    flags = it.get("flags") or {}
-    if isinstance(flags, str):
-        try:
-            flags = json.loads(flags)
-        except Exception:
-            flags = {}
+    flags = parse_flags(it.get("flags"))
 
     q, _ = classify_quality(flags)
 
@@ -103,29 +104,62 @@ def resolve_api_base() -> str:
 
 API_BASE = resolve_api_base()
 
-@st.cache_data(ttl=300)
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """
+    API 서버용 공용 Session(keep-alive)
+
+    SW 관점: streamlit은 rerun마다 스크립트 전체를 다시 실행하므로 모듈 전역 Session은 매번 새로 생김
+    → cache_resource로 프로세스당 1개만 만들어 rerun/세션 간 연결 풀을 재사용
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=10))
+    session.mount("https://", HTTPAdapter(pool_maxsize=10))
+    return session
+
+
+# API 응답 캐시 TTL(초): stage3 재계산 결과가 화면에 반영되는 최대 지연
+API_CACHE_TTL_SEC = 300
+
+
+# SW 관점: (path, params) 단위 캐시. 정렬/limit 등 위젯 조합마다 엔트리가 생기므로 개수 상한을 둠
+@st.cache_data(ttl=API_CACHE_TTL_SEC, max_entries=64, show_spinner=False)
 def api_get(path: str, params: dict | None = None):
     """FastAPI GET 호출 공통 함수(예외 발생 시 Streamlit이 에러를 보여줌)"""
-    url = f"{API_BASE}{path}"
-    r = requests.get(url, params=params, timeout=30)
+    r = _http_session().get(f"{API_BASE}{path}", params=params, timeout=30)
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)  # SW 관점: 수천 행 응답은 stdlib json(r.json()) 대신 orjson으로 디코드
+
+def parse_flags(raw) -> dict:
+    """
+    API 응답의 flags(dict 또는 JSON 문자열) -> dict
+
+    SW 관점: 행마다 호출되는 경로라 stdlib json 대신 orjson으로 디코드(str/bytes 모두 허용), 실패 시 {}
+    """
+    if not raw:
+        return {}
+    if isinstance(raw, (str, bytes)):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return {}
+    return raw
 
 # -----------------------------
 # flags -> 품질 분류(OK/WARN/EXCLUDE)
 # - 서버에도 구현할 수 있으나, MVP에서는 Streamlit에서 분류해도 충분합니다.
 # -----------------------------
-EXCLUDE_FLAG_KEYS = {
+EXCLUDE_FLAG_KEYS = frozenset({
     "FLAG_MISSING_SHARES_OUT",
     "FLAG_MISSING_EQUITY",
     "FLAG_MISSING_NET_INCOME",
-}
+})
 
-WARN_FLAG_KEYS = {
+WARN_FLAG_KEYS = frozenset({
     "FLAG_ROE_BELOW_R",
     "FLAG_ROE_NEGATIVE",
     "FLAG_NEGATIVE_RESIDUAL_CLAMPED",
-}
+})
 
 def classify_quality(flags: dict) -> tuple[str, list[str]]:
     """
@@ -135,13 +169,15 @@ def classify_quality(flags: dict) -> tuple[str, list[str]]:
     if not isinstance(flags, dict):
         return ("WARN", ["FLAG_INVALID_FLAGS_FORMAT"])
 
-    reasons = [k for k in EXCLUDE_FLAG_KEYS if k in flags]
-    if reasons:
-        return ("EXCLUDE", reasons)
+    # SW 관점: 행마다 리스트를 만들지 않고 C 레벨 집합 교집합으로 판정(해당 없으면 할당 없음)
+    # - reasons는 정렬해 반환(set 순회 순서는 프로세스마다 달라질 수 있음)
+    bad = EXCLUDE_FLAG_KEYS & flags.keys()
+    if bad:
+        return ("EXCLUDE", sorted(bad))
 
-    reasons = [k for k in WARN_FLAG_KEYS if k in flags]
-    if reasons:
-        return ("WARN", reasons)
+    warn = WARN_FLAG_KEYS & flags.keys()
+    if warn:
+        return ("WARN", sorted(warn))
 
     return ("OK", [])
 
@@ -188,29 +224,39 @@ FLAG_DESC_KO = {
     "FLAG_MISSING_NET_INCOME": "지배주주순이익(또는 대체값) 누락(계산 신뢰 낮음)",
 }
 
+@lru_cache(maxsize=1024)
+def _flag_keys_ko(flag_keys: tuple, max_items: int) -> str:
+    """FLAG_* 키 튜플 -> 한국어 요약 문자열(같은 flag 조합을 가진 행이 많아 결과를 메모이즈)."""
+    # 대표 flag만 max_items개까지 한국어 설명으로, 더 많으면 “외 N개” 표시
+    out = [FLAG_DESC_KO.get(k, k) for k in flag_keys[:max_items]]
+    if len(flag_keys) > max_items:
+        out.append(f"외 {len(flag_keys) - max_items}개")
+    return " / ".join(out)
+
+
+def reasons_korean(reasons) -> str:
+    """품질 분류 근거(flag 키 목록) -> 한국어 ' / ' 결합 문자열."""
+    return _flag_keys_ko(tuple(reasons), len(reasons)) if reasons else ""
+
+
+@lru_cache(maxsize=1024)
+def _summarize_flag_keys(keys: tuple, max_items: int) -> str:
+    """flags 전체 키 튜플 -> 요약 문자열(FLAG_* 필터링은 새로운 키 조합에서만 수행)."""
+    # FLAG_*만 뽑아서 요약 (내부 계산용 키들은 길고 가독성을 해침)
+    flag_keys = tuple(k for k in keys if str(k).startswith("FLAG_"))
+    return _flag_keys_ko(flag_keys, max_items) if flag_keys else ""
+
+
 def summarize_flags_korean(flags: dict, max_items: int = 3) -> str:
     """
     flags를 'FLAG_*' 중심으로 한국어 요약 문자열로 변환.
+
+    SW 관점: 요약은 키(순서 포함)에만 의존하므로 tuple(flags)(C 레벨 키 복사)를 캐시 키로 사용,
+    같은 키 조합이면 Python 레벨 키 순회 없이 캐시된 결과 반환
     """
     if not isinstance(flags, dict):
         return ""
-
-    # 1) FLAG_*만 뽑아서 요약 (내부 계산용 키들은 길고 가독성을 해침)
-    flag_keys = [k for k in flags.keys() if str(k).startswith("FLAG_")]
-
-    if not flag_keys:
-        return ""
-
-    # 2) 대표 flag만 max_items개까지 한국어 설명으로
-    out = []
-    for k in flag_keys[:max_items]:
-        out.append(FLAG_DESC_KO.get(k, k))
-
-    # 3) 더 많으면 “외 N개” 표시
-    if len(flag_keys) > max_items:
-        out.append(f"외 {len(flag_keys) - max_items}개")
-
-    return " / ".join(out)
+    return _summarize_flag_keys(tuple(flags), max_items)
 
 # -----------------------------
 # 한국어 컬럼명 매핑
@@ -297,32 +343,17 @@ with st.expander("S-RIM 공식/해석 가이드(학습용)", expanded=False):
     )
 
 
-def fmt_int(x):
-    """천 단위 콤마(정수형 표시). None이면 빈 문자열."""
-    if x is None:
-        return ""
-    try:
-        return f"{float(x):,.0f}"
-    except Exception:
-        return str(x)
-
-def fmt_float2(x):
-    """소수 2자리 표시. None이면 빈 문자열."""
-    if x is None:
-        return ""
-    try:
-        return f"{float(x):,.2f}"
-    except Exception:
-        return str(x)
-
-def fmt_pct2(x):
-    """퍼센트(%) 소수 2자리. gap_pct가 이미 '퍼센트 단위'라면 그대로 % 표시."""
-    if x is None:
-        return ""
-    try:
-        return f"{float(x):,.2f}%"
-    except Exception:
-        return str(x)
+# SW 관점: 숫자 포맷은 행마다 문자열로 바꾸지 않고 st.dataframe의 column_config에 위임(원시 숫자 그대로 전달)
+# - localized: 천 단위 구분(정수 표시가 필요한 컬럼은 DataFrame에서 반올림 후 전달)
+NUMBER_COLUMN_CONFIG = {
+    "시장가": st.column_config.NumberColumn(format="localized"),
+    "이론가(S-RIM)": st.column_config.NumberColumn(format="localized"),
+    "괴리율(%)": st.column_config.NumberColumn(format="%.2f%%"),
+    "ROE(단순/추정)": st.column_config.NumberColumn(format="%.2f"),
+    "PBR(파생)": st.column_config.NumberColumn(format="%.2f"),
+    "시총": st.column_config.NumberColumn(format="localized"),
+}
+INT_DISPLAY_COLS = ["시장가", "이론가(S-RIM)", "시총"]
 
 def quality_label(q: str) -> str:
     """테이블에서 배지 느낌을 주기 위한 안정적 라벨(이모지)."""
@@ -333,84 +364,139 @@ def quality_label(q: str) -> str:
     return "⛔ EXCLUDE"
 
 
+# 전체 조회 표: API 필드 -> 표시 컬럼명(순서 = 표 컬럼 순서)
+FULL_TABLE_COLS = {
+    "ticker": "티커",
+    "name": "종목명",
+    "market_price": "시장가",
+    "fair_price": "이론가(S-RIM)",
+    "gap_pct": "괴리율(%)",
+    "roe_derived": "ROE(단순/추정)",
+    "pbr_derived": "PBR(파생)",
+    "market_cap": "시총",
+}
+
+
+def build_full_table(items: list[dict]) -> tuple[pd.DataFrame, list]:
+    """
+    /srim/{snapshot} items -> (전체 조회 표 DataFrame, 행 인덱스별 ticker 목록)
+
+    SW 관점: 숫자/문자 컬럼은 from_records로 필요한 키만 한 번에 추출(행마다 .get 없음),
+    flags 기반 품질/요약 2개 컬럼만 행 단위로 계산(flags 디코드는 행당 1회)
+    """
+    table_df = pd.DataFrame.from_records(items, columns=list(FULL_TABLE_COLS)).rename(columns=FULL_TABLE_COLS)
+
+    flags_list = [parse_flags(it.get("flags")) for it in items]
+    table_df["품질"] = [quality_label(classify_quality(f)[0]) for f in flags_list]
+    table_df["주의사항(요약)"] = [summarize_flags_korean(f, max_items=3) for f in flags_list]
+
+    # 정수 표시 컬럼은 컬럼 단위로 한 번에 반올림(표시 포맷은 NUMBER_COLUMN_CONFIG)
+    table_df[INT_DISPLAY_COLS] = table_df[INT_DISPLAY_COLS].apply(pd.to_numeric, errors="coerce").round(0)
+
+    ticker_by_row = table_df["티커"].tolist()  # 행 인덱스 -> ticker 매핑(행 선택 시 사용)
+    return table_df, ticker_by_row
+
+
+# -----------------------------
+# 모드별 필터(사이드바 form 하나 -> 불변 dataclass)
+# - SW 관점: 위젯 생성은 render_* 시작에서 한 번에 끝내고, 이후 데이터 처리와 섞지 않음
+# -----------------------------
+@dataclass(frozen=True)
+class FullTableFilters:
+    only_calc_ready: bool
+    min_gap: float
+    max_gap: float
+    exclude_flags: tuple
+    limit: int
+
+
+@dataclass(frozen=True)
+class ScreenFilters:
+    min_gap: float
+    only_positive_gap: bool
+    exclude_exclude: bool
+    warn_only: bool
+    limit: int
+    # 추천 점수화(Composite Score)
+    w_gap: float
+    w_roe: float
+    w_pbr: float
+    prefer_ok_only: bool
+    top_n: int
+
+
+def _filters_full() -> FullTableFilters:
+    """전체 조회 필터 위젯("적용"을 누를 때만 rerun)."""
+    with st.sidebar.form("full_table_filters"):
+        only_calc_ready = st.checkbox("계산 성공만 보기", value=True)
+        min_gap = st.number_input("min 괴리율(%)", value=0.0)
+        max_gap = st.number_input("max 괴리율(%)", value=9999.0)
+
+        exclude_flags = st.multiselect("제외 flags", options=flag_options, default=[])
+        limit = st.slider("표시 개수", 50, 1000, 200, 50)
+        st.form_submit_button("적용")
+
+    return FullTableFilters(only_calc_ready, min_gap, max_gap, tuple(exclude_flags), limit)
+
+
+def _filters_screen() -> ScreenFilters:
+    """스크리너 + 점수화 필터 위젯("적용"을 누를 때만 rerun)."""
+    with st.sidebar.form("screen_filters"):
+        min_gap = st.number_input("min 괴리율(%) (스크리너)", value=20.0)
+        only_positive_gap = st.checkbox("저평가 후보만(gap_pct > 0)", value=True)
+        exclude_exclude = st.checkbox("EXCLUDE 등급 제외", value=True)
+        warn_only = st.checkbox("WARN만 보기(학습용)", value=False)
+        limit = st.slider("표시 개수(스크리너)", 50, 1000, 200, 50)
+
+        w_gap = st.slider("가중치: gap_pct", 0.0, 1.0, 0.6, 0.05)
+        w_roe = st.slider("가중치: ROE(파생)", 0.0, 1.0, 0.3, 0.05)
+        w_pbr = st.slider("가중치: PBR(파생)", 0.0, 1.0, 0.1, 0.05)
+
+        prefer_ok_only = st.checkbox("점수화는 OK만 대상으로", value=True)
+        top_n = st.slider("Top N", 10, 200, 50, 10)
+        st.form_submit_button("적용")
+
+    return ScreenFilters(
+        min_gap, only_positive_gap, exclude_exclude, warn_only, limit,
+        w_gap, w_roe, w_pbr, prefer_ok_only, top_n,
+    )
+
+
 # =========================================================
 # 모드 1) 전체 조회
 # =========================================================
 def render_full_table():
     st.subheader(f"결과: {snapshot_choice}")
 
-    only_calc_ready = st.sidebar.checkbox("계산 성공만 보기", value=True)
-    min_gap = st.sidebar.number_input("min 괴리율(%)", value=0.0)
-    max_gap = st.sidebar.number_input("max 괴리율(%)", value=9999.0)
-
-    exclude_flags = st.sidebar.multiselect("제외 flags", options=flag_options, default=[])
-    limit = st.sidebar.slider("표시 개수", 50, 1000, 200, 50)
+    f = _filters_full()
+    limit = f.limit
 
     # ✅ 정렬 선택(sort) UI는 이미 sidebar에서 sort 변수로 받고 있다고 가정
     params = {
-        "only_calc_ready": str(only_calc_ready).lower(),
-        "min_gap_pct": min_gap,
-        "max_gap_pct": max_gap,
+        "only_calc_ready": str(f.only_calc_ready).lower(),
+        "min_gap_pct": f.min_gap,
+        "max_gap_pct": f.max_gap,
         "limit": limit,
         "offset": 0,
         "sort": sort,
     }
-    if exclude_flags:
-        params["exclude_flags"] = exclude_flags
-
-    data = api_get(f"/srim/{snapshot_choice}", params=params)
-    items = data.get("items", [])
-
-    st.caption(f"rows={len(items)} (정렬={sort}, limit={limit})")
-
-    filtered_items = []
-    for it in items:
-        flags = it.get("flags") or {}
-        if isinstance(flags, str):
-            try:
-                flags = json.loads(flags)
-            except Exception:
-                flags = {}
-
-        q, _ = classify_quality(flags)
-        it["_quality"] = q  # 임시 저장
-
-        if only_ok and q != "OK":
-            continue
+    if f.exclude_flags:
+        params["exclude_flags"] = list(f.exclude_flags)
+    if only_ok:
+        params["quality"] = "OK"  # SW 관점: 품질 필터는 서버(SQL)에서 처리해 응답 크기 축소
+
+    # SW 관점: 같은 (snapshot, params)로 rerun되면(행 선택/다른 위젯 조작 등) API 호출·표 재구성 없이 재사용
+    # - 키에 TTL 구간 번호를 넣어 api_get과 같은 주기로 만료(재계산된 스냅샷이 세션 내내 가려지지 않도록)
+    tbl_key = (snapshot_choice, repr(sorted(params.items())), int(time.time() // API_CACHE_TTL_SEC))
+    cached_tbl = st.session_state.get("_full_table_cache")
+    if cached_tbl is not None and cached_tbl[0] == tbl_key:
+        _, table_df, ticker_by_row = cached_tbl
+    else:
+        data = api_get(f"/srim/{snapshot_choice}", params=params)
+        table_df, ticker_by_row = build_full_table(data.get("items", []))
+        st.session_state["_full_table_cache"] = (tbl_key, table_df, ticker_by_row)
 
-        filtered_items.append(it)
-        
-    # -----------------------------
-    # 테이블 표시용 행 구성(한글 컬럼명 + 숫자 포맷 + flags 한글 요약 + 품질 라벨)
-    # -----------------------------
-    table_rows = []
-    ticker_by_row = []  # 행 인덱스 -> ticker 매핑(행 선택 시 사용)
-    for it in filtered_items:
-        flags = it.get("flags") or {}
-        if isinstance(flags, str):
-            try:
-                flags = json.loads(flags)
-            except Exception:
-                flags = {}
-
-        q, reasons = classify_quality(flags)
-        flags_summary = summarize_flags_korean(flags, max_items=3)
-
-        ticker = it.get("ticker")
-        ticker_by_row.append(ticker)
-
-        table_rows.append({
-            "티커": it.get("ticker"),
-            "종목명": it.get("name"),
-            "시장가": fmt_int(it.get("market_price")),
-            "이론가(S-RIM)": fmt_int(it.get("fair_price")),
-            "괴리율(%)": fmt_pct2(it.get("gap_pct")),
-            "ROE(단순/추정)": fmt_float2(it.get("roe_derived")), # ✅ 추가
-            "PBR(파생)": fmt_float2(it.get("pbr_derived")),     # ✅ 추가
-            "시총": fmt_int(it.get("market_cap")),              # ✅ 추가
-            "품질": quality_label(it.get("_quality")),
-            "주의사항(요약)": summarize_flags_korean(flags, max_items=3),
-        })
+    st.caption(f"rows={len(table_df)} (정렬={sort}, limit={limit})")
 
     # -----------------------------
     # ✅ “테이블 클릭 → 상세 자동 업데이트”
@@ -421,9 +507,10 @@ def render_full_table():
     try:
         # Streamlit의 dataframe selection 기능(지원되는 버전에서 동작)
         event = st.dataframe(
-            table_rows,
+            table_df,
             use_container_width=True,
             height=520,
+            column_config=NUMBER_COLUMN_CONFIG,
             selection_mode="single-row",
             on_select="rerun",
         )
@@ -435,10 +522,10 @@ def render_full_table():
                 selected_ticker = ticker_by_row[idx]
     except TypeError:
         # selection_mode/on_select 인자를 지원하지 않는 Streamlit 버전
-        st.dataframe(table_rows, use_container_width=True, height=520)
+        st.dataframe(table_df, use_container_width=True, height=520, column_config=NUMBER_COLUMN_CONFIG)
     except Exception:
         # 기타 예외는 테이블 표시 자체는 유지
-        st.dataframe(table_rows, use_container_width=True, height=520)
+        st.dataframe(table_df, use_container_width=True, height=520, column_config=NUMBER_COLUMN_CONFIG)
 
     # selection이 안 된 경우: 기존 selectbox로 fallback
     if not selected_ticker:
@@ -470,26 +557,18 @@ def render_full_table():
 
     detail = api_get(f"/srim/{snapshot_choice}/ticker/{selected_ticker}")
 
-    flags_detail = detail.get("flags") or {}
-    if isinstance(flags_detail, str):
-        try:
-            flags_detail = json.loads(flags_detail)
-        except Exception:
-            flags_detail = {}
+    flags_detail = parse_flags(detail.get("flags"))
 
     q, reasons = classify_quality(flags_detail)
 
     # 배지(상세 헤더)
     st.markdown(f"품질 등급: {render_quality_badge(q)}", unsafe_allow_html=True)
     if reasons:
-        ko_reasons = [FLAG_DESC_KO.get(r, r) for r in reasons]
-        st.caption("분류 근거: " + " / ".join(ko_reasons))
+        st.caption("분류 근거: " + reasons_korean(reasons))
 
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("### 1) 원천 입력값")
-        st.json({
+    # SW 관점: 섹션별 st.json 4개 대신 dict 하나로 묶어 위젯 1개로 렌더링(expanded=2: 섹션 값까지 펼침)
+    detail_view = {
+        "1) 원천 입력값": {
             "종목": f"{detail.get('name')} ({detail.get('ticker')})",
             "시장": detail.get("market"),
             "섹터": detail.get("sector_name"),
@@ -498,22 +577,16 @@ def render_full_table():
             "발행주식수(shares_out)": detail.get("shares_out"),
             "자기주식(treasury_shares)": detail.get("treasury_shares"),
             "유통주식수(float_shares)": detail.get("float_shares"),
-        })
-
-    with col2:
-        st.markdown("### 2) 재무 입력값/품질")
-        st.json({
+        },
+        "2) 재무 입력값/품질": {
             "fs_year": detail.get("fs_year"),
             "report_code": detail.get("report_code"),
             "is_consolidated": detail.get("is_consolidated"),
             "지배주주지분(equity_parent)": detail.get("equity_parent"),
             "지배주주순이익(net_income_parent)": detail.get("net_income_parent"),
             "data_quality": detail.get("data_quality") or {},
-        })
-
-    with col3:
-        st.markdown("### 3) 파생값/결과")
-        st.json({
+        },
+        "3) 파생값/결과": {
             "bps(파생)": detail.get("bps_derived"),
             "roe(파생)": detail.get("roe_derived"),
             "스냅샷 r(discount_rate_snapshot)": detail.get("discount_rate_snapshot"),
@@ -521,37 +594,32 @@ def render_full_table():
             "이론가(fair_price)": detail.get("fair_price"),
             "괴리율(gap_pct)": detail.get("gap_pct"),
             "computed_at": detail.get("computed_at"),
-        })
-
-    st.markdown("### flags(전체)")
-    st.json(flags_detail or {})
+        },
+        "flags(전체)": flags_detail or {},
+    }
+    st.json(detail_view, expanded=2)
 
 
 
 # =========================================================
 # 모드 2) 스크리너(추천)
-# - 가능하면 서버 스크리너(/screen)를 사용하지만,
-#   서버에 아직 구현 전이면 아래처럼 /srim/{snapshot} 결과로도 대체 가능
+# - 필터/품질 분류는 서버 스크리너(/screen)가 SQL에서 처리하고, 여기서는 결과만 표시
 # =========================================================
 def render_screen():
     st.subheader(f"스크리너: {snapshot_choice} (저평가 후보)")
 
-    min_gap = st.sidebar.number_input("min 괴리율(%) (스크리너)", value=20.0)
-    only_positive_gap = st.sidebar.checkbox("저평가 후보만(gap_pct > 0)", value=True)
-    exclude_exclude = st.sidebar.checkbox("EXCLUDE 등급 제외", value=True)
-    warn_only = st.sidebar.checkbox("WARN만 보기(학습용)", value=False)
-    limit = st.sidebar.slider("표시 개수(스크리너)", 50, 1000, 200, 50)
+    f = _filters_screen()
 
     # 서버에 /screen이 구현되어 있다면 사용(추천)
     try:
         data = api_get(
             f"/srim/{snapshot_choice}/screen",
             params={
-                "min_gap_pct": min_gap,
-                "only_positive_gap": str(only_positive_gap).lower(),
-                "exclude_quality": str(exclude_exclude).lower(),
-                "warn_only": str(warn_only).lower(),
-                "limit": limit,
+                "min_gap_pct": f.min_gap,
+                "only_positive_gap": str(f.only_positive_gap).lower(),
+                "exclude_quality": str(f.exclude_exclude).lower(),
+                "warn_only": str(f.warn_only).lower(),
+                "limit": f.limit,
                 "offset": 0,
             },
         )
@@ -559,58 +627,16 @@ def render_screen():
         qc = data.get("quality_counts", {})
         st.caption(f"필터 후 total={data.get('total_after_filter')} | OK={qc.get('OK',0)} WARN={qc.get('WARN',0)} EXCLUDE={qc.get('EXCLUDE',0)}")
 
-    except Exception:
-        # /screen이 없다면 fallback: 전체 조회로 받아서 Streamlit에서 필터/분류 수행
-        base = api_get(
-            f"/srim/{snapshot_choice}",
-            params={
-                "only_calc_ready": "true",
-                "limit": 2000,
-                "offset": 0,
-                "sort": "gap_desc",
-            },
-        )
-        items0 = base.get("items", [])
+    except requests.RequestException as e:
+        # SW 관점: 필터/분류는 /screen(SQL)이 전담. 클라이언트에서 재구현하지 않고 오류만 표시
+        st.error(f"스크리너 API 호출 실패: {e}")
         items = []
-        for it in items0:
-            gap = it.get("gap_pct")
-            if gap is None:
-                continue
-            if gap < float(min_gap):
-                continue
-            if only_positive_gap and gap <= 0:
-                continue
-
-            flags = it.get("flags") or {}
-            if isinstance(flags, str):
-                try:
-                    flags = json.loads(flags)
-                except Exception:
-                    flags = {}
-
-            q, _ = classify_quality(flags)
-            if exclude_exclude and q == "EXCLUDE":
-                continue
-            if warn_only and q != "WARN":
-                continue
-
-            it2 = dict(it)
-            it2["quality"] = q
-            items.append(it2)
-
-        st.caption(f"(fallback) 필터 후 total={len(items)}")
-
-    # 테이블 표시(한글 컬럼 + 품질)
+
+    # 테이블 표시(한글 컬럼 + 품질): quality/quality_reasons는 서버가 SQL에서 계산한 값을 그대로 사용
     rows = []
-    for it in items[:limit]:
-        flags = it.get("flags") or {}
-        if isinstance(flags, str):
-            try:
-                flags = json.loads(flags)
-            except Exception:
-                flags = {}
-
-        q, reasons = classify_quality(flags)
+    for it in items:
+        q = it.get("quality")
+        reasons = it.get("quality_reasons") or []
         rows.append({
             COL_KO["ticker"]: it.get("ticker"),
             COL_KO["name"]: it.get("name"),
@@ -618,7 +644,7 @@ def render_screen():
             COL_KO["fair_price"]: it.get("fair_price"),
             COL_KO["gap_pct"]: it.get("gap_pct"),
             COL_KO["quality"]: q,
-            "품질 근거(요약)": " / ".join([FLAG_DESC_KO.get(r, r) for r in reasons]) if reasons else "",
+            "품질 근거(요약)": reasons_korean(reasons),
         })
 
     st.dataframe(rows, use_container_width=True, height=520)
@@ -635,14 +661,9 @@ def render_screen():
     st.divider()
     st.subheader("추천 점수화(Composite Score)")
 
-    w_gap = st.sidebar.slider("가중치: gap_pct", 0.0, 1.0, 0.6, 0.05)
-    w_roe = st.sidebar.slider("가중치: ROE(파생)", 0.0, 1.0, 0.3, 0.05)
-    w_pbr = st.sidebar.slider("가중치: PBR(파생)", 0.0, 1.0, 0.1, 0.05)
-
-    prefer_ok_only = st.sidebar.checkbox("점수화는 OK만 대상으로", value=True)
-    top_n = st.sidebar.slider("Top N", 10, 200, 50, 10)
-
-    weights = {"gap": w_gap, "roe": w_roe, "pbr": w_pbr}
+    weights = {"gap": f.w_gap, "roe": f.w_roe, "pbr": f.w_pbr}
+    prefer_ok_only = f.prefer_ok_only
+    top_n = f.top_n
 
     # 추천 계산은 /srim/{snapshot}에서 많이 가져와야 함 (limit 크게)
     base = api_get(
@@ -667,14 +688,14 @@ def render_screen():
             "티커": it.get("ticker"),
             "종목명": it.get("name"),
             "Composite Score": round(score, 4),
-            "괴리율(%)": fmt_pct2(it.get("gap_pct")),
-            "ROE(단순/추정)": fmt_float2(it.get("roe_derived")),
-            "PBR(파생)": fmt_float2(it.get("pbr_derived")),
-            "시총": fmt_int(it.get("market_cap")),
+            "괴리율(%)": it.get("gap_pct"),
+            "ROE(단순/추정)": it.get("roe_derived"),
+            "PBR(파생)": it.get("pbr_derived"),
+            "시총": it.get("market_cap"),
             "설명(요약)": summarize_flags_korean(it.get("flags") or {}, max_items=2),
         })
 
-    st.dataframe(rows, use_container_width=True, height=520)
+    st.dataframe(rows, use_container_width=True, height=520, column_config=NUMBER_COLUMN_CONFIG)
     st.caption("주의: Composite Score는 학습/스크리닝용 지표이며, 투자 의사결정의 단독 근거로 사용하면 안 됩니다.")
 
 